@@ -1,7 +1,7 @@
 import time
-import random
 import logging
 from pathlib import Path
+import config
 from core import create_default_kernel
 
 # ---------------------------------------------------------
@@ -30,36 +30,26 @@ def main():
     
     logger.info(f"開始: 合計 {len(TARGET_ISBNS)} 冊の処理を開始します。")
 
-    for i, isbn in enumerate(TARGET_ISBNS):
-        try:
-            logger.info(f"[{i+1}/{len(TARGET_ISBNS)}] ISBN: {isbn} の処理中...")
-            
-            # 変数の初期化
-            book_id = None
-            title = "Unknown"
+    # 1. ISBNをまとめて解決する（まず検索 → だめならIDとして直接取得、結果はキャッシュ）
+    logger.info("ISBNリストを解決中...")
+    resolved = book_plugin.resolve_many(TARGET_ISBNS)
+    for entry in resolved:
+        if entry["status"] == "resolved":
+            logger.info(f"  -> 特定成功: {entry['input']} -> {entry['book']['title']} (ID: {entry['book']['id']})")
+        elif entry["status"] == "not_found":
+            logger.warning(f"  -> ❌ 見つかりません: {entry['input']}")
+        else:
+            logger.error(f"  -> ❌ 解決エラー: {entry['input']} - {entry['error']}")
 
-            # 1. まず検索してみる
-            results = book_plugin.search(isbn)
-            
-            if results:
-                # 検索ヒットした場合
-                target_book = results[0]
-                book_id = target_book['id']
-                title = target_book['title']
-                logger.info(f"  -> 検索ヒット: {title} (ID: {book_id})")
-            else:
-                # 検索ヒットしなかった場合（ここが修正ポイント！）
-                logger.info(f"  -> 検索で見つかりませんでした。ISBNを直接IDとして試行します...")
-                try:
-                    # ISBNをIDと仮定して、直接メタデータを取得しに行く
-                    # fetch()はIDが存在しなければエラーになるので、存在確認も兼ねる
-                    book_info = book_plugin.fetch(isbn)
-                    book_id = book_info['id']
-                    title = book_info.get('title', 'Unknown Title')
-                    logger.info(f"  -> 直接特定成功: {title}")
-                except Exception as e:
-                    logger.warning(f"  -> ❌ 失敗: このISBNは検索も直接指定もできませんでした。")
-                    continue
+    targets = [entry for entry in resolved if entry["status"] == "resolved"]
+    logger.info(f"ダウンロード対象: {len(targets)}/{len(TARGET_ISBNS)} 冊")
+
+    for i, entry in enumerate(targets):
+        isbn = entry["input"]
+        book_id = entry["book"]["id"]
+        title = entry["book"].get("title") or "Unknown Title"
+        try:
+            logger.info(f"[{i+1}/{len(targets)}] ISBN: {isbn} ({title}) の処理中...")
 
             # 2. ダウンロード実行
             logger.info("  -> ダウンロード開始...")
@@ -68,20 +58,17 @@ def main():
                 output_dir=output_dir,
                 formats=formats,
                 skip_images=skip_images,
-                progress_callback=lambda p: print(f"    Progress: {p.percentage}% - {p.status}", end="\r")
+                progress_callback=lambda p: print(f"    Progress: {p.percentage}% - {p.status}", end="\r"),
+                deadline=config.DOWNLOAD_DEADLINE,
             )
             
             print("") # 改行
             logger.info(f"  -> ✅ 完了: {title}")
-
-            # 3. 待機（BAN回避）
-            wait_time = random.uniform(10, 30) 
-            logger.info(f"  -> 休憩中... ({wait_time:.1f}秒)")
-            time.sleep(wait_time)
+            # 待機は不要: HttpClient が 429/Retry-After に応じて自動で速度を調整する
 
         except Exception as e:
             logger.error(f"エラー発生 ISBN: {isbn} - {str(e)}")
             time.sleep(5)
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 BASE_DIR = Path(__file__).parent
@@ -7,8 +8,16 @@ OUTPUT_DIR = BASE_DIR / "output"
 DATA_DIR = BASE_DIR / "data"
 if DATA_DIR.exists():
     COOKIES_FILE = DATA_DIR / "cookies.json"
+    CACHE_DIR = DATA_DIR / "cache"
+    CASSETTE_DIR = DATA_DIR / "cassettes"
+    RATE_LIMIT_DB = DATA_DIR / "rate_limit.db"
+    ASSET_STORE_DIR = DATA_DIR / "assets"
 else:
     COOKIES_FILE = BASE_DIR / "cookies.json"
+    CACHE_DIR = BASE_DIR / ".cache"
+    CASSETTE_DIR = BASE_DIR / ".cache" / "cassettes"
+    RATE_LIMIT_DB = BASE_DIR / ".cache" / "rate_limit.db"
+    ASSET_STORE_DIR = BASE_DIR / ".cache" / "assets"
 
 BASE_URL = "https://learning.oreilly.com"
 API_V1 = f"{BASE_URL}/api/v1"
@@ -16,6 +25,137 @@ API_V2 = f"{BASE_URL}/api/v2"
 
 REQUEST_DELAY = 0.5
 REQUEST_TIMEOUT = 30
+# Fail fast on unreachable hosts while still allowing slow responses.
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 30
+
+# Persist GET responses under CACHE_DIR and revalidate them with
+# If-None-Match / If-Modified-Since instead of downloading again.
+HTTP_CACHE_ENABLED = True
+
+# Images and stylesheets are kept once per content hash in ASSET_STORE_DIR
+# and hardlinked (or copied, across filesystems) into each book, so repeat
+# downloads skip the network and shared assets take disk space once.
+ASSET_STORE_ENABLED = True
+
+# Optional image optimization (needs Pillow): scale images down to the page
+# width at IMAGE_TARGET_DPI and recompress PNGs losslessly, for smaller and
+# faster PDF/EPUB output. JPEGs are only re-encoded when scaled down. Set
+# IMAGE_PNG_TO_JPEG=1 as well to turn opaque photographic PNGs into JPEGs
+# at IMAGE_JPEG_QUALITY, which is lossy.
+IMAGE_OPTIMIZE = os.environ.get("IMAGE_OPTIMIZE", "").lower() in ("1", "true", "yes")
+IMAGE_PNG_TO_JPEG = os.environ.get("IMAGE_PNG_TO_JPEG", "").lower() in ("1", "true", "yes")
+IMAGE_TARGET_DPI = 150
+IMAGE_PAGE_WIDTH_INCHES = 6.0
+IMAGE_JPEG_QUALITY = 85
+
+# The web UI shows covers through /api/cover/{id}: each cover is fetched
+# once, and thumbnails at these widths (pixels) are kept under CACHE_DIR
+# and served with a long max-age. Needs Pillow; without it the endpoint
+# redirects to the original cover.
+COVER_THUMBNAIL_WIDTHS = (96, 192)
+COVER_MAX_AGE = 7 * 24 * 60 * 60
+
+# Chapter HTML rewriting: "bs4" runs the BeautifulSoup passes; "lxml" does
+# every rewrite in one pass while lxml parses, and must match "bs4" on the
+# corpus in tests/fixtures/html.
+HTML_PROCESSOR = os.environ.get("HTML_PROCESSOR", "bs4")
+
+# Book metadata is cached in memory and under CACHE_DIR; IDs that returned
+# 404 are remembered for a shorter time so reruns don't ask again.
+METADATA_CACHE_TTL = 24 * 60 * 60
+METADATA_NEGATIVE_TTL = 60 * 60
+
+# Download plans weight progress by file sizes from the book's file
+# manifest, cached like metadata. A selection of fewer chapters than this
+# skips reading an uncached manifest and weights files equally.
+PLAN_MANIFEST_MIN_CHAPTERS = 10
+
+# Recent searches are answered from memory, so search-as-you-type and
+# repeated queries don't spend the request budget.
+SEARCH_CACHE_TTL = 10 * 60
+SEARCH_CACHE_SIZE = 256
+
+# Opening a book in the web UI prefetches its chapter list and TOC in the
+# background at bulk priority; download() uses the result if it starts
+# within PREFETCH_TTL seconds.
+PREFETCH_ENABLED = True
+PREFETCH_TTL = 5 * 60
+
+# Record/replay upstream traffic per book for offline benchmarking:
+# set CASSETTE_MODE=record once, then CASSETTE_MODE=replay with optional
+# simulated latency (seconds) and bandwidth (bytes/second).
+CASSETTE_MODE = os.environ.get("CASSETTE_MODE") or None
+CASSETTE_LATENCY = float(os.environ.get("CASSETTE_LATENCY", "0"))
+CASSETTE_BANDWIDTH = float(os.environ.get("CASSETTE_BANDWIDTH", "0")) or None
+
+# Concurrency: requests allowed in flight at once, and how many tokens the
+# rate limiter may accumulate while idle (REQUEST_DELAY still caps the rate).
+MAX_CONCURRENT_REQUESTS = 4
+RATE_LIMIT_BURST = 4
+
+# Set SHARED_RATE_LIMIT=1 to draw every process on this machine (batch
+# runners, web containers sharing data/) from one token bucket stored in
+# RATE_LIMIT_DB. Adaptive rate control moves the shared rate for all of
+# them; a process joining keeps the current rate, so a back-off is never
+# undone, and the rate starts again from 1 / REQUEST_DELAY once the bucket
+# has been idle for a while.
+SHARED_RATE_LIMIT = os.environ.get("SHARED_RATE_LIMIT", "").lower() in ("1", "true", "yes")
+
+# Priority classes per endpoint class: interactive requests take the next
+# token and skip the concurrency cap; bulk still gets BULK_MIN_SHARE of the
+# tokens while it is waiting.
+REQUEST_PRIORITIES = {
+    "search": "interactive",
+    "epub": "metadata",
+    "epub-chapters": "metadata",
+    "other": "metadata",
+    "default": "bulk",
+}
+BULK_MIN_SHARE = 0.2
+
+# Adaptive (AIMD) rate control: start at 1 / REQUEST_DELAY, add
+# RATE_INCREASE_STEP req/s per RATE_INCREASE_INTERVAL seconds of healthy
+# responses up to MAX_REQUEST_RATE (kept near 1 / REQUEST_DELAY, so the
+# budget is only exceeded slightly), and cut rate and concurrency on
+# 429/503 or slow responses, honoring Retry-After.
+ADAPTIVE_RATE_ENABLED = True
+MIN_REQUEST_RATE = 0.2
+MAX_REQUEST_RATE = 2.5
+RATE_INCREASE_STEP = 0.05
+RATE_INCREASE_INTERVAL = 1.0
+RATE_DECREASE_FACTOR = 0.5
+SLOW_RESPONSE_SECONDS = 10.0
+
+# Retries for transient failures (timeouts, resets, 429/5xx), as total
+# attempts per endpoint class, with exponential jittered backoff.
+RETRY_MAX_ATTEMPTS = {
+    "search": 2,
+    "content": 5,
+    "default": 4,
+}
+RETRY_BASE_DELAY = 0.5
+RETRY_MAX_DELAY = 30.0
+
+# Circuit breaker: after this many consecutive failures, fail fast for
+# CIRCUIT_RESET_SECONDS before letting a trial request through.
+CIRCUIT_FAILURE_THRESHOLD = 8
+CIRCUIT_RESET_SECONDS = 30.0
+
+# Give up on a book's upstream requests after DOWNLOAD_DEADLINE seconds,
+# retries included, so one stuck book cannot hold up the web UI or a
+# batch run. Unset (0) means no limit.
+DOWNLOAD_DEADLINE = float(os.environ.get("DOWNLOAD_DEADLINE", "0")) or None
+
+# Hedged requests: once a content/image/CSS request has taken longer than
+# the HEDGE_PERCENTILE latency of recent requests to that endpoint class,
+# send a duplicate and use whichever answers first. Both count against the
+# rate budget.
+HEDGE_ENABLED = True
+HEDGE_ENDPOINTS = ("content", "image", "css")
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 0.25
 
 HEADERS = {
     "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8",
@@ -1,3 +1,5 @@
 from .kernel import Kernel, create_default_kernel
 from .http_client import HttpClient
+from .async_http_client import AsyncHttpClient
+from .chapter_document import ChapterDocument
 from .types import ChapterInfo, ChapterSummary, BookInfo, FormatInfo
@@ -0,0 +1,117 @@
+"""Content-addressed store of downloaded assets shared across books."""
+
+import hashlib
+import os
+import shutil
+import uuid
+from pathlib import Path
+
+from .http_cache import write_atomic
+
+
+def _digest(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _same_content(source: Path, dest: Path) -> bool:
+    try:
+        if os.path.samefile(source, dest):
+            return True
+        return source.stat().st_size == dest.stat().st_size and _digest(source) == _digest(dest)
+    except OSError:
+        return False
+
+
+def place(source: Path, dest: Path):
+    """Put ``source`` at ``dest`` as a hardlink, or as a copy across filesystems.
+
+    Concurrent calls for the same ``dest`` each go through their own temp
+    file, and finding ``dest`` already holding the same content counts as
+    success.
+    """
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        if os.path.samefile(source, dest):
+            return
+    except OSError:
+        pass
+    tmp = dest.with_name(f".{dest.name}.{uuid.uuid4().hex}.link")
+    try:
+        try:
+            os.link(source, tmp)
+        except OSError:
+            shutil.copyfile(source, tmp)
+        try:
+            os.replace(tmp, dest)
+        except OSError:
+            if not _same_content(source, dest):
+                raise
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+class AssetStore:
+    """Asset bodies stored once by SHA-256, indexed by the URL they came from.
+
+    ``blobs/`` holds each distinct body once; ``urls/`` maps a source URL
+    to its blob. Files handed out to book directories are hardlinks into
+    the store where the filesystem allows, so they must be replaced
+    rather than modified in place.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def _url_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode()).hexdigest()
+        return self.root / "urls" / key[:2] / key
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    def lookup(self, url: str) -> Path | None:
+        """Stored blob for ``url``, or None if it has never been downloaded."""
+        try:
+            digest = self._url_path(url).read_text().strip()
+        except OSError:
+            return None
+        blob = self._blob_path(digest)
+        return blob if blob.exists() else None
+
+    def link(self, url: str, dest: Path) -> bool:
+        """Place the stored copy of ``url`` at ``dest``. Returns False on a miss."""
+        blob = self.lookup(url)
+        if blob is None:
+            return False
+        place(blob, dest)
+        return True
+
+    def read(self, url: str) -> bytes | None:
+        blob = self.lookup(url)
+        if blob is None:
+            return None
+        try:
+            return blob.read_bytes()
+        except OSError:
+            return None
+
+    def add(self, url: str, path: Path):
+        """Adopt a freshly downloaded file, deduplicating it against stored blobs."""
+        digest = _digest(path)
+        blob = self._blob_path(digest)
+        if blob.exists():
+            place(blob, path)
+        else:
+            place(path, blob)
+        write_atomic(self._url_path(url), digest.encode())
+
+    def add_bytes(self, url: str, data: bytes):
+        digest = hashlib.sha256(data).hexdigest()
+        blob = self._blob_path(digest)
+        if not blob.exists():
+            write_atomic(blob, data)
+        write_atomic(self._url_path(url), digest.encode())
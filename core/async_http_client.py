@@ -0,0 +1,79 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterable, TypeVar
+
+from .http_client import HttpClient
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class AsyncHttpClient:
+    """Asyncio front end to an HttpClient.
+
+    Coroutines await the sync client's methods on one shared pool of
+    ``max_concurrency`` threads, so any number of fetches can be
+    outstanding from a single event loop while only that many threads
+    exist. Every request still goes through the sync client: its rate
+    limiter and priorities, retries, circuit breaker, response cache,
+    single-flight, deadlines and cassette. Each call carries the awaiting
+    thread's priority, deadline, cancellation check and cassette, as with
+    ``HttpClient.propagate()``.
+
+    Interactive requests belong on the sync client: here they would wait
+    for a thread behind bulk work.
+    """
+
+    def __init__(self, http: HttpClient, max_workers: int | None = None):
+        self.http = http
+        self._pool = ThreadPoolExecutor(
+            max_workers=max_workers or http.max_concurrency, thread_name_prefix="http-async"
+        )
+
+    async def run(self, fn: Callable[..., R], *args, **kwargs) -> R:
+        """Await ``fn(*args, **kwargs)`` on the client's threads."""
+        call = self.http.propagate(partial(fn, *args, **kwargs))
+        return await asyncio.get_running_loop().run_in_executor(self._pool, call)
+
+    async def completed(
+        self,
+        fn: Callable[[T], R],
+        items: Iterable[T],
+        limit: int | None = None,
+    ) -> AsyncIterator[tuple[T, R]]:
+        """Run ``fn(item)`` for every item, yielding ``(item, result)`` as each finishes.
+
+        At most ``limit`` calls are outstanding at once (the client's
+        threads bound them anyway). Calls not yet started are cancelled
+        if the caller stops iterating or one of them raises.
+        """
+        semaphore = asyncio.Semaphore(limit) if limit else None
+
+        async def call(item: T) -> tuple[T, R]:
+            if semaphore is None:
+                return item, await self.run(fn, item)
+            async with semaphore:
+                return item, await self.run(fn, item)
+
+        tasks = [asyncio.ensure_future(call(item)) for item in items]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def get_json(self, url: str, **kwargs) -> dict:
+        return await self.run(self.http.get_json, url, **kwargs)
+
+    async def get_text(self, url: str, **kwargs) -> str:
+        return await self.run(self.http.get_text, url, **kwargs)
+
+    async def get_bytes(self, url: str, **kwargs) -> bytes:
+        return await self.run(self.http.get_bytes, url, **kwargs)
+
+    async def download_to(self, url: str, save_path: Path, **kwargs) -> int:
+        return await self.run(self.http.download_to, url, save_path, **kwargs)
@@ -0,0 +1,92 @@
+"""Record/replay of upstream traffic for offline, reproducible runs."""
+
+import base64
+import gzip
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+
+import requests
+
+from .http_cache import build_response, storable_headers
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMissError(requests.exceptions.RequestException):
+    """A replayed request has no recorded response."""
+
+
+class Cassette:
+    """Request/response pairs stored as gzipped JSON lines, one per request.
+
+    In ``record`` mode every response passing through the client is
+    appended with its status, headers and body. In ``replay`` mode
+    responses are served from the file in recorded order per URL (the last
+    one repeats once a URL's recordings are used up), optionally delayed
+    by ``latency`` seconds plus the body size over ``bandwidth`` bytes/s to
+    approximate the live service.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        mode: str,
+        latency: float = 0.0,
+        bandwidth: float | None = None,
+    ):
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self._entries: dict[str, deque] = defaultdict(deque)
+        self._file = None
+        self._lock = threading.Lock()
+
+        if mode == REPLAY:
+            self._load()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = gzip.open(path, "wt", encoding="utf-8")
+
+    def _load(self):
+        if not self.path.exists():
+            raise FileNotFoundError(f"No cassette recorded at {self.path}")
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                entry = json.loads(line)
+                self._entries[entry["url"]].append(entry)
+
+    def record(self, url: str, response: requests.Response):
+        entry = {
+            "url": url,
+            "status": response.status_code,
+            "headers": storable_headers(response.headers),
+            "body": base64.b64encode(response.content).decode("ascii"),
+        }
+        with self._lock:
+            self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+
+    def play(self, url: str) -> requests.Response:
+        with self._lock:
+            recorded = self._entries.get(url)
+            if not recorded:
+                raise CassetteMissError(f"No recorded response for {url}")
+            entry = recorded.popleft() if len(recorded) > 1 else recorded[0]
+
+        body = base64.b64decode(entry["body"])
+        delay = self.latency + (len(body) / self.bandwidth if self.bandwidth else 0.0)
+        if delay > 0:
+            time.sleep(delay)
+        return build_response(url, entry["status"], entry["headers"], body)
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
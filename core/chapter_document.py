@@ -0,0 +1,33 @@
+"""Per-chapter document shared by every output format."""
+
+from dataclasses import dataclass
+from functools import cached_property
+
+from .text_extractor import CodeBlock, ExtractedContent, TextExtractor
+
+
+@dataclass
+class ChapterDocument:
+    """A processed chapter, parsed at most once however many formats are rendered.
+
+    ``html`` is the rewritten chapter body (as written to the EPUB). The text
+    view - plain text with paragraph breaks and fenced code, plus the code
+    blocks - is extracted from it on first use and shared by the plaintext,
+    JSON and chunking outputs.
+    """
+
+    filename: str
+    title: str
+    html: str
+
+    @cached_property
+    def _extracted(self) -> ExtractedContent:
+        return TextExtractor().extract(self.html)
+
+    @property
+    def text(self) -> str:
+        return self._extracted.text
+
+    @property
+    def code_blocks(self) -> list[CodeBlock]:
+        return self._extracted.code_blocks
@@ -0,0 +1,36 @@
+"""Classification of upstream URLs into endpoint classes.
+
+Endpoint classes let the HTTP client apply per-class policies (retry
+limits, priorities) and report statistics at a useful granularity.
+"""
+
+from urllib.parse import urlparse
+
+SEARCH = "search"
+EPUB = "epub"
+CHAPTERS = "epub-chapters"
+CONTENT = "content"
+IMAGE = "image"
+CSS = "css"
+OTHER = "other"
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".bmp", ".tif", ".tiff")
+
+
+def classify(url: str) -> str:
+    """Return the endpoint class for an upstream URL."""
+    path = urlparse(url).path.lower()
+
+    if path.endswith(".css"):
+        return CSS
+    if path.endswith(IMAGE_EXTENSIONS) or "/library/cover/" in path:
+        return IMAGE
+    if "/api/v2/search/" in path:
+        return SEARCH
+    if "/api/v2/epub-chapters/" in path:
+        return CHAPTERS
+    if "/api/v2/epubs/" in path:
+        if "/files/" in path and not path.endswith("/files/"):
+            return CONTENT
+        return EPUB
+    return OTHER
@@ -0,0 +1,134 @@
+"""Persistent, content-addressed HTTP response cache."""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+def build_response(url: str, status: int, headers: dict, body: bytes) -> requests.Response:
+    """Build a fully-read ``requests.Response`` from stored parts."""
+    response = requests.Response()
+    response.url = url
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = body
+    response._content_consumed = True
+    return response
+
+
+def storable_headers(headers) -> dict:
+    """Headers worth persisting alongside an already-decoded body."""
+    return {
+        name: value
+        for name, value in headers.items()
+        if name.lower() not in ("content-encoding", "content-length", "transfer-encoding", "set-cookie")
+    }
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write ``data`` to ``path`` via a temp file so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+@dataclass
+class CacheEntry:
+    """Index record pointing a request key at a stored body."""
+
+    url: str
+    blob: str
+    etag: str | None = None
+    last_modified: str | None = None
+    headers: dict = field(default_factory=dict)
+    stored_at: float = 0.0
+
+    def conditional_headers(self) -> dict:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """On-disk cache of GET responses revalidated with ETag/Last-Modified.
+
+    Bodies are stored once under ``blobs/`` by the SHA-256 of their content,
+    so identical responses from different URLs share storage. Small JSON
+    index entries under ``index/`` map a request key (URL plus auth scope)
+    to a body hash and the validators needed for a conditional request.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+
+    def key(self, url: str, scope: str = "") -> str:
+        return hashlib.sha256(f"{scope}\n{url}".encode()).hexdigest()
+
+    def _index_path(self, key: str) -> Path:
+        return self.root / "index" / key[:2] / f"{key}.json"
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.root / "blobs" / digest[:2] / digest
+
+    def lookup(self, key: str) -> CacheEntry | None:
+        path = self._index_path(key)
+        try:
+            entry = CacheEntry(**json.loads(path.read_text()))
+        except (OSError, ValueError, TypeError):
+            return None
+        if not self._blob_path(entry.blob).exists():
+            return None
+        return entry
+
+    def load_response(self, entry: CacheEntry) -> requests.Response | None:
+        """Rebuild the cached 200 response, or None if the body has gone missing."""
+        try:
+            body = self._blob_path(entry.blob).read_bytes()
+        except OSError:
+            return None
+        return build_response(entry.url, 200, entry.headers, body)
+
+    def store(self, key: str, response: requests.Response) -> bool:
+        """Cache a successful response that carries a validator. Returns True if stored."""
+        if response.status_code != 200 or response.history:
+            return False
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return False
+
+        body = response.content
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            write_atomic(blob_path, body)
+
+        headers = storable_headers(response.headers)
+        entry = CacheEntry(
+            url=response.url,
+            blob=digest,
+            etag=etag,
+            last_modified=last_modified,
+            headers=headers,
+            stored_at=time.time(),
+        )
+        write_atomic(self._index_path(key), json.dumps(asdict(entry)).encode())
+        return True
@@ -1,44 +1,457 @@
+import hashlib
 import json
+import logging
+import os
+import tempfile
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from functools import wraps
 from pathlib import Path
+from typing import Callable
 
 import requests
+from requests.adapters import HTTPAdapter
+from requests.cookies import RequestsCookieJar
 
 import config
+from . import endpoints
+from .cassette import REPLAY, Cassette
+from .http_cache import ResponseCache
+from .http_stats import HttpStats
+from .pagination import page_urls
+from .rate_limiter import (
+    INTERACTIVE,
+    AdaptiveRateController,
+    ConcurrencyLimiter,
+    PriorityGate,
+    SharedTokenBucket,
+    TokenBucket,
+    parse_retry_after,
+)
+from .retry import CircuitBreaker, DeadlineExceeded, RequestCancelled, RetryPolicy
+from .singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+
+class DownloadIntegrityError(requests.exceptions.RequestException):
+    """A streamed download did not match its expected size or hash."""
 
 
 class HttpClient:
-    def __init__(self, cookies_file: Path | None = None):
-        self.session = requests.Session()
-        self.session.headers.update(config.HEADERS)
-        self.last_request_time = 0
+    """Thread-safe HTTP client shared by all plugins.
+
+    Each thread gets its own ``requests.Session``; the sessions share one
+    cookie jar and one connection pool. Up to ``max_concurrency`` requests
+    may be in flight at once, while a shared token bucket keeps the
+    aggregate rate at one request per ``REQUEST_DELAY`` seconds (across all
+    processes on the machine with ``SHARED_RATE_LIMIT``).
+
+    Requests are queued for tokens by priority class (interactive, metadata,
+    bulk), chosen per endpoint class from ``REQUEST_PRIORITIES`` or for the
+    calling thread with ``priority()``. Interactive requests also bypass
+    the concurrency cap, so the UI stays responsive during a download.
+
+    Successful GETs that carry an ETag or Last-Modified header are kept in
+    an on-disk cache and revalidated with conditional requests, so an
+    unchanged resource costs a 304 instead of a full download.
+
+    With ``ADAPTIVE_RATE_ENABLED`` the rate and in-flight limit are tuned at
+    runtime from response status and latency; see AdaptiveRateController.
+
+    Transient failures are retried with jittered exponential backoff, and a
+    circuit breaker fails requests fast while upstream is clearly down.
+
+    Requests use separate connect and read timeouts, and ``deadline()``
+    bounds everything a thread sends, retries included. Content, image and
+    CSS requests slower than their recent p95 are hedged with a duplicate
+    request; the first answer wins.
+
+    Every attempt is recorded in ``stats`` (an HttpStats) per endpoint class.
+
+    Identical GETs issued concurrently at the same priority are coalesced:
+    later callers wait for the first caller's response instead of sending
+    their own. A higher-priority caller never waits on a lower-priority one.
+
+    Inside ``use_cassette()`` traffic is recorded to, or replayed from, an
+    on-disk cassette so runs can be reproduced without network access.
+    """
+
+    def __init__(self, cookies_file: Path | None = None, max_concurrency: int | None = None):
+        self.max_concurrency = max_concurrency or config.MAX_CONCURRENT_REQUESTS
+        self.cookies = RequestsCookieJar()
+        if config.SHARED_RATE_LIMIT:
+            self.limiter = SharedTokenBucket(
+                config.RATE_LIMIT_DB, rate=1 / config.REQUEST_DELAY, capacity=config.RATE_LIMIT_BURST
+            )
+        else:
+            self.limiter = TokenBucket(rate=1 / config.REQUEST_DELAY, capacity=config.RATE_LIMIT_BURST)
+        self._gate = PriorityGate(self.limiter, bulk_share=config.BULK_MIN_SHARE)
+        self._adapter = HTTPAdapter(pool_maxsize=self.max_concurrency)
+        self._slots = ConcurrencyLimiter(self.max_concurrency)
+        self.rate_control = None
+        if config.ADAPTIVE_RATE_ENABLED:
+            self.rate_control = AdaptiveRateController(
+                self.limiter,
+                self._slots,
+                min_rate=config.MIN_REQUEST_RATE,
+                max_rate=config.MAX_REQUEST_RATE,
+                max_concurrency=self.max_concurrency,
+                increase=config.RATE_INCREASE_STEP,
+                increase_interval=config.RATE_INCREASE_INTERVAL,
+                decrease=config.RATE_DECREASE_FACTOR,
+                slow_threshold=config.SLOW_RESPONSE_SECONDS,
+            )
+        self._local = threading.local()
+        self.retry_policy = RetryPolicy(
+            max_attempts=config.RETRY_MAX_ATTEMPTS,
+            base_delay=config.RETRY_BASE_DELAY,
+            max_delay=config.RETRY_MAX_DELAY,
+        )
+        self.breaker = CircuitBreaker(
+            failure_threshold=config.CIRCUIT_FAILURE_THRESHOLD,
+            reset_timeout=config.CIRCUIT_RESET_SECONDS,
+        )
+        self.stats = HttpStats()
+        self._inflight = SingleFlight()
+        self._hedge_pool = ThreadPoolExecutor(
+            max_workers=self.max_concurrency * 4, thread_name_prefix="http-hedge"
+        )
+        self.cache = ResponseCache(config.CACHE_DIR / "http") if config.HTTP_CACHE_ENABLED else None
+        self.auth_scope = ""
 
         cookies_path = cookies_file or config.COOKIES_FILE
         if cookies_path.exists():
             self._load_cookies(cookies_path)
 
+    @property
+    def session(self) -> requests.Session:
+        """Session for the calling thread, sharing cookies and the connection pool."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.headers.update(config.HEADERS)
+            session.cookies = self.cookies
+            session.mount("https://", self._adapter)
+            session.mount("http://", self._adapter)
+            self._local.session = session
+        return session
+
     def _load_cookies(self, path: Path):
         try:
             with open(path) as f:
                 cookies = json.load(f)
             if isinstance(cookies, dict):
                 for name, value in cookies.items():
-                    self.session.cookies.set(name, value, domain=".oreilly.com")
+                    self.cookies.set(name, value, domain=".oreilly.com")
+                self.auth_scope = self._scope_for(cookies)
         except (json.JSONDecodeError, ValueError):
             pass  # Empty or invalid file, skip loading
 
-    def _rate_limit(self):
-        elapsed = time.time() - self.last_request_time
-        if elapsed < config.REQUEST_DELAY:
-            time.sleep(config.REQUEST_DELAY - elapsed)
-        self.last_request_time = time.time()
+    def _scope_for(self, cookies: dict) -> str:
+        """Fingerprint the loaded credentials so cached responses never cross accounts."""
+        payload = json.dumps(cookies, sort_keys=True, default=str).encode()
+        return hashlib.sha256(payload).hexdigest()[:16]
+
+    def _rate_limit(self, priority: str, cancelled: Callable[[], bool] | None = None) -> float:
+        return self._gate.acquire(priority, cancelled)
+
+    @contextmanager
+    def priority(self, priority: str):
+        """Send this thread's requests with ``priority`` for the duration."""
+        previous = getattr(self._local, "priority", None)
+        self._local.priority = priority
+        try:
+            yield
+        finally:
+            self._local.priority = previous
+
+    @contextmanager
+    def deadline(self, seconds: float | None = None, at: float | None = None):
+        """Fail this thread's requests with DeadlineExceeded after ``seconds``.
+
+        ``at`` gives the deadline as a ``time.monotonic()`` value instead.
+        Nested deadlines can only shorten the enclosing one.
+        """
+        previous = getattr(self._local, "deadline", None)
+        if seconds is not None:
+            at = time.monotonic() + seconds
+        if at is not None and previous is not None:
+            at = min(at, previous)
+        self._local.deadline = at if at is not None else previous
+        try:
+            yield
+        finally:
+            self._local.deadline = previous
+
+    def current_deadline(self) -> float | None:
+        return getattr(self._local, "deadline", None)
+
+    @contextmanager
+    def cancellation(self, cancelled: Callable[[], bool] | None):
+        """Abandon this thread's requests with RequestCancelled once ``cancelled()`` is True.
+
+        It is checked while waiting for the rate limiter and again just
+        before sending, so a request that waited for its token can still
+        be dropped.
+        """
+        previous = getattr(self._local, "cancelled", None)
+        self._local.cancelled = cancelled
+        try:
+            yield
+        finally:
+            self._local.cancelled = previous
 
-    def get(self, url: str, **kwargs) -> requests.Response:
-        self._rate_limit()
+    @property
+    def cassette(self) -> Cassette | None:
+        """The cassette this thread's requests are recorded to or replayed from."""
+        return getattr(self._local, "cassette", None)
+
+    def propagate(self, fn):
+        """Wrap ``fn`` to run with the calling thread's priority, deadline,
+        cancellation check and cassette.
+
+        Use it when handing requests to a worker pool, whose threads would
+        otherwise start without them.
+        """
+        priority = getattr(self._local, "priority", None)
+        deadline = self.current_deadline()
+        cancelled = getattr(self._local, "cancelled", None)
+        cassette = self.cassette
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            previous = self.cassette
+            self._local.cassette = cassette
+            try:
+                with self.priority(priority), self.deadline(at=deadline), self.cancellation(cancelled):
+                    return fn(*args, **kwargs)
+            finally:
+                self._local.cassette = previous
+
+        return wrapper
+
+    def _remaining(self, url: str) -> float | None:
+        """Seconds left before this thread's deadline; raises once it has passed."""
+        deadline = self.current_deadline()
+        if deadline is None:
+            return None
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline exceeded before fetching {url}")
+        return remaining
+
+    def _priority_for(self, endpoint: str) -> str:
+        priority = getattr(self._local, "priority", None)
+        if priority:
+            return priority
+        priorities = config.REQUEST_PRIORITIES
+        return priorities.get(endpoint, priorities["default"])
+
+    def get(self, url: str, use_cache: bool = True, **kwargs) -> requests.Response:
         if not url.startswith("http"):
             url = config.BASE_URL + url
-        kwargs.setdefault("timeout", config.REQUEST_TIMEOUT)
-        return self.session.get(url, **kwargs)
+        kwargs.setdefault("timeout", (config.CONNECT_TIMEOUT, config.READ_TIMEOUT))
+
+        # Streamed bodies can only be read once, so they are never shared.
+        if kwargs.get("stream"):
+            return self._get(url, use_cache, **kwargs)
+
+        priority = self._priority_for(endpoints.classify(url))
+        key = (
+            url,
+            use_cache,
+            priority,
+            self.current_deadline(),
+            getattr(self._local, "cancelled", None),
+            self.cassette,
+            repr(sorted(kwargs.items())),
+        )
+        response, shared = self._inflight.do(key, lambda: self._get(url, use_cache, **kwargs))
+        if shared:
+            self.stats.record_coalesced(endpoints.classify(url))
+        return response
+
+    def _get(self, url: str, use_cache: bool, **kwargs) -> requests.Response:
+        if not use_cache or self.cache is None or self.cassette is not None or kwargs.get("stream"):
+            return self._send(url, **kwargs)
+
+        key = self.cache.key(url, self.auth_scope)
+        entry = self.cache.lookup(key)
+        if entry:
+            headers = kwargs.pop("headers", None) or {}
+            response = self._send(url, headers={**headers, **entry.conditional_headers()}, **kwargs)
+            if response.status_code == 304:
+                cached = self.cache.load_response(entry)
+                if cached is not None:
+                    return cached
+                response = self._send(url, headers=headers, **kwargs)
+        else:
+            response = self._send(url, **kwargs)
+
+        self.cache.store(key, response)
+        return response
+
+    def _send(self, url: str, **kwargs) -> requests.Response:
+        """Send a GET, retrying transient failures per the endpoint's policy."""
+        policy = self.retry_policy
+        endpoint = endpoints.classify(url)
+        attempts = policy.attempts_for(endpoint)
+        priority = self._priority_for(endpoint)
+        timeout = kwargs.pop("timeout", None)
+
+        for attempt in range(1, attempts + 1):
+            remaining = self._remaining(url)
+            if remaining is not None:
+                timeout = _cap_timeout(timeout, remaining)
+            self.breaker.before_request()
+            try:
+                response = self._attempt(url, endpoint, priority, timeout=timeout, **kwargs)
+            except policy.RETRYABLE_EXCEPTIONS as e:
+                self.breaker.record_failure()
+                if attempt == attempts:
+                    raise
+                delay = policy.backoff(attempt)
+                reason = type(e).__name__
+            except BaseException:
+                self.breaker.release()
+                raise
+            else:
+                status = response.status_code
+                # Any answer below 500 (a 429 included) shows upstream is up.
+                if status >= 500:
+                    self.breaker.record_failure()
+                else:
+                    self.breaker.record_success()
+                if status not in policy.RETRYABLE_STATUSES:
+                    return response
+                if attempt == attempts:
+                    return response
+                retry_after = parse_retry_after(response.headers.get("Retry-After")) or 0
+                delay = max(policy.backoff(attempt), retry_after)
+                reason = f"HTTP {status}"
+                response.close()
+
+            remaining = self._remaining(url)
+            if remaining is not None and delay >= remaining:
+                raise DeadlineExceeded(f"Deadline exceeded retrying {url} after {reason}")
+            logger.info("Retrying %s after %s (attempt %d/%d, %.1fs)", url, reason, attempt, attempts, delay)
+            time.sleep(delay)
+
+    def _attempt(self, url: str, endpoint: str, priority: str, **kwargs) -> requests.Response:
+        """Send once, hedging with a duplicate request if the first one is slow."""
+        delay = self._hedge_delay(endpoint)
+        if delay is None:
+            return self._send_once(url, endpoint, priority, **kwargs)
+
+        # Time the primary from when it goes on the wire, not from when it
+        # started queueing for a slot and a token.
+        sent = threading.Event()
+        primary = self._hedge_pool.submit(self._send_once, url, endpoint, priority, on_send=sent.set, **kwargs)
+        primary.add_done_callback(lambda _: sent.set())
+        sent.wait()
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        self.stats.record_hedge(endpoint)
+        logger.debug("Hedging %s after %.2fs", url, delay)
+        hedge = self._hedge_pool.submit(self._send_once, url, endpoint, priority, **kwargs)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for loser in {primary, hedge} - {future}:
+                        loser.add_done_callback(_close_response)
+                    self.stats.record_hedge(endpoint, won=future is hedge)
+                    return future.result()
+        return primary.result()
+
+    def _hedge_delay(self, endpoint: str) -> float | None:
+        """How long to wait before hedging, or None if this request is not hedged."""
+        if not config.HEDGE_ENABLED or endpoint not in config.HEDGE_ENDPOINTS or self.cassette is not None:
+            return None
+        if self.stats.count(endpoint) < config.HEDGE_MIN_SAMPLES:
+            return None
+        return max(config.HEDGE_MIN_DELAY, self.stats.percentile(endpoint, config.HEDGE_PERCENTILE))
+
+    def _send_once(self, url: str, endpoint: str, priority: str, on_send=None, **kwargs) -> requests.Response:
+        cassette = self.cassette
+        if cassette is not None and cassette.mode == REPLAY:
+            start = time.monotonic()
+            response = cassette.play(url)
+            self.stats.record(endpoint, response.status_code, time.monotonic() - start, len(response.content))
+            return response
+
+        cancelled = getattr(self._local, "cancelled", None)
+        wait_start = time.monotonic()
+        with nullcontext() if priority == INTERACTIVE else self._slots:
+            self._rate_limit(priority, cancelled)
+            if cancelled is not None and cancelled():
+                raise RequestCancelled(f"Cancelled before fetching {url}")
+            if on_send is not None:
+                on_send()
+            start = time.monotonic()
+            try:
+                response = self.session.get(url, **kwargs)
+            except requests.exceptions.RequestException:
+                self.stats.record(endpoint, None, time.monotonic() - start, limiter_wait=start - wait_start)
+                raise
+        latency = time.monotonic() - start
+
+        nbytes = 0 if kwargs.get("stream") else len(response.content)
+        self.stats.record(endpoint, response.status_code, latency, nbytes, start - wait_start)
+        if cassette is not None:
+            cassette.record(url, response)
+
+        if self.rate_control is not None:
+            self.rate_control.on_response(
+                response.status_code,
+                latency,
+                parse_retry_after(response.headers.get("Retry-After")),
+            )
+        return response
+
+    @contextmanager
+    def use_cassette(
+        self,
+        path: Path,
+        mode: str,
+        latency: float = 0.0,
+        bandwidth: float | None = None,
+    ):
+        """Record this thread's traffic to ``path``, or replay it from there, for the duration.
+
+        Worker threads started through ``propagate()`` share the cassette;
+        other threads are unaffected. The response cache, and the plugins'
+        own caches, are bypassed meanwhile so recordings are complete and
+        replays are hermetic.
+        """
+        cassette = Cassette(path, mode, latency=latency, bandwidth=bandwidth)
+        previous = self.cassette
+        self._local.cassette = cassette
+        try:
+            yield cassette
+        finally:
+            self._local.cassette = previous
+            cassette.close()
+
+    def rate_status(self) -> dict:
+        """Current request rate, concurrency, back-off events, circuit state and queue depths."""
+        if self.rate_control is not None:
+            status = self.rate_control.snapshot()
+        else:
+            status = {
+                "rate": self.limiter.rate,
+                "concurrency": self._slots.limit,
+                "events": [],
+            }
+        status["circuit"] = self.breaker.state
+        status["queued"] = self._gate.queued()
+        return status
 
     def get_json(self, url: str, **kwargs) -> dict:
         response = self.get(url, **kwargs)
@@ -55,8 +468,117 @@ class HttpClient:
         response.raise_for_status()
         return response.content
 
+    def get_pages(self, url: str) -> list[dict]:
+        """Fetch every page of a paginated API listing, in order.
+
+        The first page's ``count`` and size give the URLs of the others,
+        which are fetched concurrently; otherwise, or if the listing grew
+        meanwhile, ``next`` links are followed one at a time.
+        """
+        pages = [self.get_json(url)]
+        urls = page_urls(pages[0])
+        if urls:
+            pool = ThreadPoolExecutor(max_workers=min(len(urls), self.max_concurrency))
+            try:
+                pages.extend(pool.map(self.propagate(self.get_json), urls))
+            finally:
+                pool.shutdown(wait=True, cancel_futures=True)
+
+        next_url = pages[-1].get("next")
+        while next_url:
+            pages.append(self.get_json(next_url))
+            next_url = pages[-1].get("next")
+        return pages
+
+    def download_to(
+        self,
+        url: str,
+        save_path: Path,
+        expected_size: int | None = None,
+        sha256: str | None = None,
+        chunk_size: int = 64 * 1024,
+        **kwargs,
+    ) -> int:
+        """Stream a response body to ``save_path`` and return the bytes written.
+
+        The body is written to a hidden temp file beside ``save_path`` and
+        renamed into place only once it is complete and matches
+        ``expected_size`` / ``sha256`` (and Content-Length when the body is
+        not compressed), so a crash never leaves a truncated file behind.
+        Interrupted transfers are retried like any other transient failure;
+        the GET itself is already retried by ``_send``, so only failures
+        while reading the body are retried here.
+        """
+        policy = self.retry_policy
+        attempts = policy.attempts_for(endpoints.classify(url))
+        for attempt in range(1, attempts + 1):
+            response = self.get(url, stream=True, **kwargs)
+            try:
+                return self._stream_to_file(response, url, save_path, expected_size, sha256, chunk_size)
+            except (*policy.RETRYABLE_EXCEPTIONS, DownloadIntegrityError) as e:
+                remaining = self._remaining(url)
+                if attempt == attempts:
+                    raise
+                delay = policy.backoff(attempt)
+                if remaining is not None and delay >= remaining:
+                    raise DeadlineExceeded(f"Deadline exceeded retrying download of {url}") from e
+                logger.info("Retrying download of %s after %s (attempt %d/%d, %.1fs)",
+                            url, type(e).__name__, attempt, attempts, delay)
+                time.sleep(delay)
+
+    def _stream_to_file(
+        self,
+        response: requests.Response,
+        url: str,
+        save_path: Path,
+        expected_size: int | None,
+        sha256: str | None,
+        chunk_size: int,
+    ) -> int:
+        with response:
+            response.raise_for_status()
+            if expected_size is None and "Content-Encoding" not in response.headers:
+                length = response.headers.get("Content-Length")
+                expected_size = int(length) if length and length.isdigit() else None
+
+            save_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=save_path.parent, prefix=f".{save_path.name}.", suffix=".part")
+            try:
+                digest = hashlib.sha256()
+                size = 0
+                with os.fdopen(fd, "wb") as f:
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        f.write(chunk)
+                        digest.update(chunk)
+                        size += len(chunk)
+                self.stats.add_bytes(endpoints.classify(url), size)
+
+                if expected_size is not None and size != expected_size:
+                    raise DownloadIntegrityError(f"{url}: expected {expected_size} bytes, got {size}")
+                if sha256 and digest.hexdigest() != sha256.lower():
+                    raise DownloadIntegrityError(f"{url}: SHA-256 mismatch")
+                os.replace(tmp, save_path)
+            except BaseException:
+                Path(tmp).unlink(missing_ok=True)
+                raise
+        return size
+
     def reload_cookies(self):
         """Clear and reload cookies from file. Used after browser login."""
-        self.session.cookies.clear()
+        self.cookies.clear()
+        self.auth_scope = ""
         if config.COOKIES_FILE.exists():
             self._load_cookies(config.COOKIES_FILE)
+
+
+def _cap_timeout(timeout, limit: float):
+    """Shorten a requests timeout (seconds or a (connect, read) pair) to ``limit``."""
+    if isinstance(timeout, tuple):
+        return tuple(limit if t is None else min(t, limit) for t in timeout)
+    return limit if timeout is None else min(timeout, limit)
+
+
+def _close_response(future):
+    """Release the connection held by a hedged request that lost the race."""
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
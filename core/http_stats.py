@@ -0,0 +1,135 @@
+"""Per-endpoint instrumentation of upstream requests."""
+
+import threading
+from bisect import bisect_left
+from collections import Counter, deque
+from dataclasses import dataclass, field
+
+# Upper bounds (seconds) of the latency histogram buckets; the last bucket is open-ended.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _quantile(ordered: list[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+@dataclass
+class EndpointStats:
+    """Counters for one endpoint class."""
+
+    requests: int = 0
+    errors: int = 0
+    coalesced: int = 0
+    hedged: int = 0
+    hedge_wins: int = 0
+    statuses: Counter = field(default_factory=Counter)
+    latency_histogram: list[int] = field(default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1))
+    latency_total: float = 0.0
+    bytes: int = 0
+    limiter_wait: float = 0.0
+    recent_latencies: deque = field(default_factory=lambda: deque(maxlen=256))
+
+
+class HttpStats:
+    """Thread-safe request statistics keyed by endpoint class (see core.endpoints).
+
+    Tracks request counts, status codes, a latency histogram, bytes
+    transferred and time spent blocked waiting for a rate-limit token or
+    a concurrency slot. Recent latencies are kept for percentile queries.
+    """
+
+    def __init__(self):
+        self._endpoints: dict[str, EndpointStats] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, endpoint: str) -> EndpointStats:
+        stats = self._endpoints.get(endpoint)
+        if stats is None:
+            stats = self._endpoints[endpoint] = EndpointStats()
+        return stats
+
+    def record(
+        self,
+        endpoint: str,
+        status: int | None,
+        latency: float,
+        nbytes: int = 0,
+        limiter_wait: float = 0.0,
+    ):
+        """Record one request; ``status`` is None when no response arrived."""
+        with self._lock:
+            stats = self._get(endpoint)
+            stats.requests += 1
+            if status is None:
+                stats.errors += 1
+            else:
+                stats.statuses[status] += 1
+            stats.latency_histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+            stats.latency_total += latency
+            stats.recent_latencies.append(latency)
+            stats.bytes += nbytes
+            stats.limiter_wait += limiter_wait
+
+    def record_coalesced(self, endpoint: str):
+        """Count a caller served by another caller's identical in-flight request."""
+        with self._lock:
+            self._get(endpoint).coalesced += 1
+
+    def record_hedge(self, endpoint: str, won: bool | None = None):
+        """Count a hedged request when sent (``won`` None) and when it answered first."""
+        with self._lock:
+            stats = self._get(endpoint)
+            if won is None:
+                stats.hedged += 1
+            elif won:
+                stats.hedge_wins += 1
+
+    def count(self, endpoint: str) -> int:
+        """Number of recent latencies available for percentile queries."""
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            return len(stats.recent_latencies) if stats else 0
+
+    def add_bytes(self, endpoint: str, nbytes: int):
+        """Account for body bytes read after the request was recorded (streaming)."""
+        with self._lock:
+            self._get(endpoint).bytes += nbytes
+
+    def percentile(self, endpoint: str, q: float) -> float | None:
+        """Latency at quantile ``q`` (0-1) over recent requests, or None without data."""
+        with self._lock:
+            stats = self._endpoints.get(endpoint)
+            if stats is None or not stats.recent_latencies:
+                return None
+            ordered = sorted(stats.recent_latencies)
+        return _quantile(ordered, q)
+
+    def snapshot(self) -> dict:
+        """JSON-serializable view of all counters."""
+        with self._lock:
+            result = {}
+            for name, stats in self._endpoints.items():
+                ordered = sorted(stats.recent_latencies)
+                result[name] = {
+                    "requests": stats.requests,
+                    "errors": stats.errors,
+                    "coalesced": stats.coalesced,
+                    "hedged": stats.hedged,
+                    "hedge_wins": stats.hedge_wins,
+                    "statuses": {str(k): v for k, v in sorted(stats.statuses.items())},
+                    "bytes": stats.bytes,
+                    # Coalesced callers can create an entry before any request is recorded.
+                    "latency_avg": round(stats.latency_total / stats.requests, 4) if stats.requests else None,
+                    "latency_p50": round(_quantile(ordered, 0.5), 4) if ordered else None,
+                    "latency_p95": round(_quantile(ordered, 0.95), 4) if ordered else None,
+                    "latency_histogram": {
+                        **{f"le_{b}": n for b, n in zip(LATENCY_BUCKETS, stats.latency_histogram)},
+                        "inf": stats.latency_histogram[-1],
+                    },
+                    "limiter_wait": round(stats.limiter_wait, 4),
+                }
+            return result
+
+    def reset(self):
+        with self._lock:
+            self._endpoints.clear()
@@ -1,9 +1,11 @@
+from .async_http_client import AsyncHttpClient
 from .http_client import HttpClient
 
 
 class Kernel:
     def __init__(self, http: HttpClient | None = None):
         self.http = http or HttpClient()
+        self.async_http = AsyncHttpClient(self.http)
         self._plugins: dict[str, object] = {}
 
     def register(self, name: str, plugin):
@@ -25,6 +27,7 @@ def create_default_kernel() -> Kernel:
         ChaptersPlugin,
         AssetsPlugin,
         HtmlProcessorPlugin,
+        ImageOptimizerPlugin,
         EpubPlugin,
         MarkdownPlugin,
         PdfPlugin,
@@ -32,6 +35,7 @@ def create_default_kernel() -> Kernel:
         PlainTextPlugin,
         JsonExportPlugin,
         ChunkingPlugin,
+        FetchPlannerPlugin,
         OutputPlugin,
         SystemPlugin,
         DownloaderPlugin,
@@ -45,6 +49,8 @@ def create_default_kernel() -> Kernel:
     kernel.register("chapters", ChaptersPlugin())
     kernel.register("assets", AssetsPlugin())
     kernel.register("html_processor", HtmlProcessorPlugin())
+    kernel.register("planner", FetchPlannerPlugin())
+    kernel.register("image_optimizer", ImageOptimizerPlugin())
 
     # Output format plugins
     kernel.register("epub", EpubPlugin())
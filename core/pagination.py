@@ -0,0 +1,33 @@
+"""Helpers for the API's paginated list responses."""
+
+import math
+from urllib.parse import parse_qs, urlencode, urlparse
+
+
+def page_urls(first_page: dict) -> list[str]:
+    """URLs of every page after ``first_page`` of a paginated API response.
+
+    Works for both page-number (``?page=2``) and limit/offset
+    (``?offset=20``) pagination, using the total ``count`` and the size of
+    the first page. Returns an empty list when there is nothing more to
+    fetch or the scheme isn't recognized.
+    """
+    next_url = first_page.get("next")
+    count = first_page.get("count")
+    size = len(first_page.get("results", []))
+    if not next_url or not isinstance(count, int) or size == 0:
+        return []
+
+    parsed = urlparse(next_url)
+    query = parse_qs(parsed.query)
+    total_pages = math.ceil(count / size)
+
+    def with_param(name: str, value: int) -> str:
+        params = {**query, name: [str(value)]}
+        return parsed._replace(query=urlencode(params, doseq=True)).geturl()
+
+    if query.get("page") == ["2"]:
+        return [with_param("page", n) for n in range(2, total_pages + 1)]
+    if query.get("offset") == [str(size)]:
+        return [with_param("offset", n * size) for n in range(1, total_pages)]
+    return []
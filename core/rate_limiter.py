@@ -0,0 +1,417 @@
+"""Rate limiting primitives used by the HTTP client."""
+
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from typing import Callable
+
+from .retry import RequestCancelled
+
+logger = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+METADATA = "metadata"
+BULK = "bulk"
+PRIORITIES = (INTERACTIVE, METADATA, BULK)
+
+
+class TokenBucket:
+    """Thread-safe token bucket enforcing an aggregate request rate.
+
+    Tokens refill continuously at ``rate`` per second up to ``capacity``.
+    Each request reserves one token; callers that arrive while the bucket
+    is empty sleep until their reservation comes due, so concurrent
+    callers are served in arrival order without exceeding the rate.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._grown = float("-inf")
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def set_rate(self, rate: float):
+        """Change the refill rate; tokens accrued so far are kept."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = rate
+
+    def update_rate(self, fn: Callable[[float], float]) -> float:
+        """Replace the rate with ``fn(rate)`` in one step; returns the new rate."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = fn(self.rate)
+            return self.rate
+
+    def grow_rate(self, step: float, max_rate: float, interval: float = 1.0) -> bool:
+        """Raise the rate by ``step`` up to ``max_rate``, at most once per ``interval`` seconds.
+
+        Growth is therefore linear in wall-clock time however many
+        requests succeed. Returns False, changing nothing, if the rate
+        already grew within the last ``interval`` or is at ``max_rate``.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now - self._grown < interval or self.rate >= max_rate:
+                return False
+            self._refill(now)
+            self._grown = now
+            self.rate = min(max_rate, self.rate + step)
+            return True
+
+    def pause(self, seconds: float):
+        """Hold back every reservation made in the next ``seconds``."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def _reserve(self) -> float:
+        """Take a token, returning how long the caller must wait before using it."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1
+            return -self._tokens / self.rate if self._tokens < 0 else 0.0
+
+    def acquire(self) -> float:
+        """Reserve a token, blocking until it is available. Returns seconds waited."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class SharedTokenBucket(TokenBucket):
+    """TokenBucket whose state lives in SQLite, shared by every process using ``path``.
+
+    Each operation is one ``BEGIN IMMEDIATE`` transaction, which SQLite
+    serializes across processes with a file lock, so all processes on the
+    machine draw from one budget. Rate changes and Retry-After pauses made
+    by one process apply to all of them, and growth happens once per
+    interval however many processes see healthy responses. A process
+    joining a bucket in use keeps its current rate (a back-off stays in
+    effect), only lowering it to ``rate`` if that is smaller; the bucket
+    is reset to ``rate`` when it is new or no process has used it for
+    ``STALE_SECONDS``. Wall-clock time is used because monotonic clocks
+    are not comparable between processes.
+    """
+
+    STALE_SECONDS = 600.0
+
+    def __init__(self, path: Path, rate: float, capacity: float = 1.0, name: str = "default"):
+        self.path = path
+        self.name = name
+        self.capacity = capacity
+        self._local = threading.local()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS buckets"
+                " (name TEXT PRIMARY KEY, tokens REAL, rate REAL, updated REAL, grown REAL)"
+            )
+            now = time.time()
+            db.execute(
+                "INSERT INTO buckets VALUES (?, ?, ?, ?, 0) ON CONFLICT (name) DO UPDATE SET"
+                " tokens = CASE WHEN updated < ? THEN excluded.tokens ELSE tokens END,"
+                " rate = CASE WHEN updated < ? THEN excluded.rate ELSE min(rate, excluded.rate) END",
+                (name, capacity, rate, now, now - self.STALE_SECONDS, now - self.STALE_SECONDS),
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    def _connection(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._local.db = db
+        return db
+
+    @contextmanager
+    def _state(self):
+        """Yield the refilled ``[tokens, rate, grown]`` for update inside one transaction."""
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            tokens, rate, updated, grown = db.execute(
+                "SELECT tokens, rate, updated, grown FROM buckets WHERE name = ?", (self.name,)
+            ).fetchone()
+            now = time.time()
+            state = [min(self.capacity, tokens + max(0.0, now - updated) * rate), rate, grown]
+            yield state
+            db.execute(
+                "UPDATE buckets SET tokens = ?, rate = ?, updated = ?, grown = ? WHERE name = ?",
+                (state[0], state[1], now, state[2], self.name),
+            )
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    @property
+    def rate(self) -> float:
+        row = self._connection().execute(
+            "SELECT rate FROM buckets WHERE name = ?", (self.name,)
+        ).fetchone()
+        return row[0]
+
+    def set_rate(self, rate: float):
+        with self._state() as state:
+            state[1] = rate
+
+    def update_rate(self, fn: Callable[[float], float]) -> float:
+        with self._state() as state:
+            state[1] = fn(state[1])
+        return state[1]
+
+    def grow_rate(self, step: float, max_rate: float, interval: float = 1.0) -> bool:
+        with self._state() as state:
+            now = time.time()
+            if now - state[2] < interval or state[1] >= max_rate:
+                return False
+            state[1] = min(max_rate, state[1] + step)
+            state[2] = now
+        return True
+
+    def pause(self, seconds: float):
+        with self._state() as state:
+            state[0] = min(state[0], -seconds * state[1])
+
+    def _reserve(self) -> float:
+        with self._state() as state:
+            state[0] -= 1
+            return -state[0] / state[1] if state[0] < 0 else 0.0
+
+
+class PriorityGate:
+    """Hands out token bucket reservations by priority class.
+
+    One caller at a time holds the bucket; when it has its token, the turn
+    passes to the oldest waiter of the most urgent class, so an interactive
+    request waits for at most one token interval however much bulk work is
+    queued. So bulk work is never starved, it gets every
+    ``round(1 / bulk_share)``-th turn while any bulk request is waiting.
+    """
+
+    CANCEL_POLL_SECONDS = 0.05
+
+    def __init__(self, bucket: TokenBucket, bulk_share: float = 0.2):
+        self.bucket = bucket
+        self.bulk_every = max(1, round(1 / bulk_share)) if bulk_share > 0 else 0
+        self._queues: dict[str, deque] = {p: deque() for p in PRIORITIES}
+        self._busy = False
+        self._since_bulk = 0
+        self._cond = threading.Condition()
+
+    def _next(self):
+        bulk = self._queues[BULK]
+        if bulk and self.bulk_every and self._since_bulk >= self.bulk_every - 1:
+            return bulk[0]
+        for priority in PRIORITIES:
+            if self._queues[priority]:
+                return self._queues[priority][0]
+        return None
+
+    def acquire(self, priority: str = BULK, cancelled: Callable[[], bool] | None = None) -> float:
+        """Wait for this class's turn and a token. Returns seconds waited.
+
+        ``cancelled`` is polled while queued; once it returns True the
+        caller leaves the queue and RequestCancelled is raised.
+        """
+        if priority not in self._queues:
+            raise ValueError(f"Unknown priority: {priority}")
+        ticket = object()
+        start = time.monotonic()
+        with self._cond:
+            queue = self._queues[priority]
+            queue.append(ticket)
+            while self._busy or self._next() is not ticket:
+                if cancelled is not None and cancelled():
+                    queue.remove(ticket)
+                    self._cond.notify_all()
+                    raise RequestCancelled("Cancelled while waiting for the rate limiter")
+                self._cond.wait(None if cancelled is None else self.CANCEL_POLL_SECONDS)
+            queue.popleft()
+            self._busy = True
+            self._since_bulk = 0 if priority == BULK else self._since_bulk + 1
+        try:
+            self.bucket.acquire()
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+        return time.monotonic() - start
+
+    def queued(self) -> dict[str, int]:
+        """Number of callers waiting in each priority class."""
+        with self._cond:
+            return {p: len(q) for p, q in self._queues.items()}
+
+
+class ConcurrencyLimiter:
+    """Counting semaphore whose limit can be changed while it is in use."""
+
+    def __init__(self, limit: int):
+        self._limit = limit
+        self._active = 0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    @limit.setter
+    def limit(self, value: int):
+        with self._cond:
+            self._limit = max(1, value)
+            self._cond.notify_all()
+
+    def __enter__(self):
+        with self._cond:
+            while self._active >= self._limit:
+                self._cond.wait()
+            self._active += 1
+        return self
+
+    def __exit__(self, *exc):
+        with self._cond:
+            self._active -= 1
+            self._cond.notify()
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Parse a Retry-After header given either as seconds or as an HTTP date."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+@dataclass
+class BackoffEvent:
+    """A single multiplicative decrease, kept for observability."""
+
+    timestamp: float
+    reason: str
+    rate: float
+    concurrency: int
+    retry_after: float | None = None
+
+
+class AdaptiveRateController:
+    """Additive-increase / multiplicative-decrease control of rate and concurrency.
+
+    Healthy responses raise the request rate by ``increase`` at most once
+    per ``increase_interval`` seconds (see TokenBucket.grow_rate), so it
+    climbs linearly in time up to ``max_rate``. Once per window of
+    ``concurrency`` healthy responses one more request may be in flight.
+    A 429/503 or a response slower than
+    ``slow_threshold`` multiplies both by ``decrease``; a Retry-After header
+    additionally pauses the token bucket for the requested time. Decreases
+    are rate-limited by ``cooldown`` so one burst of errors counts once.
+    """
+
+    THROTTLE_STATUSES = frozenset([429, 503])
+
+    def __init__(
+        self,
+        bucket: TokenBucket,
+        slots: ConcurrencyLimiter,
+        min_rate: float,
+        max_rate: float,
+        max_concurrency: int,
+        increase: float,
+        decrease: float,
+        slow_threshold: float,
+        increase_interval: float = 1.0,
+        cooldown: float = 2.0,
+        history: int = 100,
+    ):
+        self.bucket = bucket
+        self.slots = slots
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.max_concurrency = max_concurrency
+        self.increase = increase
+        self.decrease = decrease
+        self.slow_threshold = slow_threshold
+        self.increase_interval = increase_interval
+        self.cooldown = cooldown
+        self.events: deque[BackoffEvent] = deque(maxlen=history)
+        self._healthy_streak = 0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def on_response(self, status: int, latency: float, retry_after: float | None = None):
+        if status in self.THROTTLE_STATUSES:
+            self._back_off(str(status), retry_after)
+        elif latency > self.slow_threshold:
+            self._back_off("slow", None)
+        elif status < 500:
+            self._grow()
+
+    def _grow(self):
+        with self._lock:
+            self.bucket.grow_rate(self.increase, self.max_rate, self.increase_interval)
+            self._healthy_streak += 1
+            if self._healthy_streak >= self.slots.limit and self.slots.limit < self.max_concurrency:
+                self.slots.limit = self.slots.limit + 1
+                self._healthy_streak = 0
+
+    def _back_off(self, reason: str, retry_after: float | None):
+        with self._lock:
+            self._healthy_streak = 0
+            if retry_after:
+                self.bucket.pause(retry_after)
+
+            now = time.monotonic()
+            if now - self._last_decrease < self.cooldown and not retry_after:
+                return
+            self._last_decrease = now
+
+            rate = self.bucket.update_rate(lambda r: max(self.min_rate, r * self.decrease))
+            self.slots.limit = max(1, int(self.slots.limit * self.decrease))
+            event = BackoffEvent(
+                timestamp=time.time(),
+                reason=reason,
+                rate=rate,
+                concurrency=self.slots.limit,
+                retry_after=retry_after,
+            )
+            self.events.append(event)
+
+        logger.warning(
+            "Backing off (%s): rate=%.2f req/s, concurrency=%d, retry_after=%s",
+            reason, event.rate, event.concurrency, retry_after,
+        )
+
+    def snapshot(self) -> dict:
+        """Current rate, concurrency and recent back-off events."""
+        with self._lock:
+            return {
+                "rate": round(self.bucket.rate, 3),
+                "concurrency": self.slots.limit,
+                "min_rate": self.min_rate,
+                "max_rate": self.max_rate,
+                "max_concurrency": self.max_concurrency,
+                "events": [asdict(e) for e in self.events],
+            }
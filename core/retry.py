@@ -0,0 +1,112 @@
+"""Retry policy and circuit breaker for idempotent upstream requests."""
+
+import random
+import threading
+import time
+from dataclasses import dataclass, field
+
+import requests
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised without contacting upstream while the circuit breaker is open."""
+
+
+class DeadlineExceeded(requests.exceptions.RequestException):
+    """Raised when a request cannot complete before the caller's deadline."""
+
+
+class RequestCancelled(requests.exceptions.RequestException):
+    """Raised instead of sending a request its caller no longer wants."""
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter and per-endpoint-class attempt limits.
+
+    ``max_attempts`` maps an endpoint class (see core.endpoints) to the total
+    number of attempts; classes not listed use the ``"default"`` entry.
+    """
+
+    max_attempts: dict[str, int] = field(default_factory=lambda: {"default": 4})
+    base_delay: float = 0.5
+    max_delay: float = 30.0
+
+    RETRYABLE_STATUSES = frozenset([429, 500, 502, 503, 504])
+    RETRYABLE_EXCEPTIONS = (
+        requests.exceptions.ConnectionError,
+        requests.exceptions.Timeout,
+        requests.exceptions.ChunkedEncodingError,
+    )
+
+    def attempts_for(self, endpoint: str) -> int:
+        return max(1, self.max_attempts.get(endpoint, self.max_attempts.get("default", 1)))
+
+    def backoff(self, attempt: int) -> float:
+        """Delay before retry number ``attempt`` (1-based), drawn uniformly up to the cap."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """Fail fast once upstream looks down.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    every request raises CircuitOpenError for ``reset_timeout`` seconds.
+    It then lets a single trial request through (half-open): success
+    closes the circuit, failure opens it again. A trial that ends either
+    way must be resolved with ``release()`` so another one can be sent.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may be sent now."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if self._state == self.OPEN and remaining > 0:
+                raise CircuitOpenError(
+                    f"Upstream unavailable; circuit open for another {remaining:.0f}s"
+                )
+            if self._trial_in_flight:
+                raise CircuitOpenError("Upstream unavailable; waiting on trial request")
+            self._state = self.HALF_OPEN
+            self._trial_in_flight = True
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release(self):
+        """End a request that neither succeeded nor failed (e.g. an unexpected error)."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+            self._trial_in_flight = False
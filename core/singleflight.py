@@ -0,0 +1,53 @@
+"""Coalescing of identical concurrent calls (single-flight)."""
+
+import threading
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Run at most one call per key at a time; concurrent callers share its outcome.
+
+    The first caller for a key executes ``fn``. Callers arriving while it is
+    running block until it finishes and receive the same result, or the
+    same exception. Nothing is cached once the call completes.
+    """
+
+    def __init__(self):
+        self._calls: dict[object, _Call] = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn: Callable[[], T]) -> tuple[T, bool]:
+        """Return ``(result, shared)``; ``shared`` is True when another caller did the work."""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = self._calls[key] = _Call()
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
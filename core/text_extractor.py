@@ -1,6 +1,6 @@
 """
 Utility for extracting clean text from HTML content.
-Used by PlainTextPlugin, JsonExportPlugin, and ChunkingPlugin.
+Used by ChapterDocument, which the text-based format plugins read from.
 """
 
 import re
@@ -0,0 +1,76 @@
+"""In-memory LRU cache with per-entry expiry, optionally persisted to disk."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from .http_cache import write_atomic
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU mapping whose entries expire ``ttl`` seconds after being set.
+
+    With ``directory`` set, entries are also written there as small JSON
+    files (so values must be JSON-serializable) and survive restarts; the
+    in-memory LRU of ``maxsize`` entries sits in front of the files.
+    """
+
+    def __init__(self, ttl: float, maxsize: int = 256, directory: Path | None = None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.directory = directory
+        self._entries: OrderedDict[str, tuple[float, object]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / digest[:2] / f"{digest}.json"
+
+    def get(self, key: str, default=None):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+
+        if self.directory is None:
+            return default
+        try:
+            data = json.loads(self._path(key).read_text())
+        except (OSError, ValueError):
+            return default
+        if data.get("key") != key or data.get("expires", 0) <= now:
+            return default
+        self._remember(key, data["expires"], data["value"])
+        return data["value"]
+
+    def set(self, key: str, value, ttl: float | None = None):
+        expires = time.time() + (self.ttl if ttl is None else ttl)
+        self._remember(key, expires, value)
+        if self.directory is not None:
+            payload = {"key": key, "expires": expires, "value": value}
+            write_atomic(self._path(key), json.dumps(payload).encode())
+
+    def _remember(self, key: str, expires: float, value):
+        with self._lock:
+            self._entries[key] = (expires, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.directory is not None:
+            self._path(key).unlink(missing_ok=True)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
@@ -21,6 +21,23 @@ class ChapterInfo(TypedDict):
     minutes_required: float | None
 
 
+class PlannedFile(TypedDict):
+    """One file in a download plan built by FetchPlannerPlugin.plan()."""
+
+    url: str
+    kind: str
+    size: int | None
+
+
+class ResolvedBook(TypedDict):
+    """Outcome for one identifier passed to BookPlugin.resolve_many()."""
+
+    input: str
+    status: str  # "resolved", "not_found" or "error"
+    book: dict | None
+    error: str | None
+
+
 class ChapterSummary(TypedDict):
     """Simplified chapter info for client display (e.g., chapter picker UI)."""
 
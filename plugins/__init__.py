@@ -1,9 +1,10 @@
 from .base import Plugin
 from .auth import AuthPlugin
-from .book import BookPlugin
+from .book import BookPlugin, BookNotFoundError, SearchCancelled
 from .chapters import ChaptersPlugin
 from .assets import AssetsPlugin
 from .html_processor import HtmlProcessorPlugin
+from .image_optimizer import ImageOptimizerPlugin
 from .epub import EpubPlugin
 from .markdown import MarkdownPlugin
 from .pdf import PdfPlugin
@@ -11,6 +12,7 @@ from .token import TokenPlugin
 from .plaintext import PlainTextPlugin
 from .json_export import JsonExportPlugin
 from .chunking import ChunkingPlugin, ChunkConfig
+from .planner import FetchPlannerPlugin, FetchPlan
 
 # Orchestration and system plugins
 from .output import OutputPlugin
@@ -1,26 +1,37 @@
+import asyncio
+import hashlib
+from contextlib import aclosing
 from pathlib import Path
 from typing import Callable
 
+import config
+from core.asset_store import AssetStore
+from core.http_cache import write_atomic
+from core.singleflight import SingleFlight
 from .base import Plugin
 
 
 class AssetsPlugin(Plugin):
-    def download_image(self, url: str, save_path: Path) -> bool:
-        if save_path.exists():
-            return True
+    def __init__(self):
+        self.store = AssetStore(config.ASSET_STORE_DIR) if config.ASSET_STORE_ENABLED else None
+        self._thumbnails = SingleFlight()
 
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        content = self.http.get_bytes(url)
-        save_path.write_bytes(content)
-        return True
+    def _store(self) -> AssetStore | None:
+        """The shared asset store, unless a cassette needs every request to reach it."""
+        return self.store if self.http.cassette is None else None
 
-    def download_css(self, url: str, save_path: Path) -> bool:
+    def download_image(self, url: str, save_path: Path) -> bool:
+        # Files only appear once complete (see HttpClient.download_to),
+        # so an existing file is always a finished download.
         if save_path.exists():
             return True
+        store = self._store()
+        if store is not None and store.link(url, save_path):
+            return True
 
-        save_path.parent.mkdir(parents=True, exist_ok=True)
-        content = self.http.get_text(url)
-        save_path.write_text(content)
+        self.http.download_to(url, save_path)
+        if store is not None:
+            store.add(url, save_path)
         return True
 
     def download_all_images(
@@ -28,16 +39,41 @@ class AssetsPlugin(Plugin):
         urls: list[str],
         output_dir: Path,
         progress_callback: Callable[[int, int], None] | None = None,
+        max_workers: int | None = None,
+        item_callback: Callable[[str], None] | None = None,
     ) -> dict[str, Path]:
+        """Download images concurrently; the HTTP client enforces the rate budget.
+
+        Duplicate URLs are fetched once. ``item_callback`` receives each URL
+        as it completes. Runs download_all_images_async() to completion.
+        """
+        return asyncio.run(self.download_all_images_async(
+            urls, output_dir, progress_callback, max_workers, item_callback
+        ))
+
+    async def download_all_images_async(
+        self,
+        urls: list[str],
+        output_dir: Path,
+        progress_callback: Callable[[int, int], None] | None = None,
+        max_workers: int | None = None,
+        item_callback: Callable[[str], None] | None = None,
+    ) -> dict[str, Path]:
+        """Async variant of download_all_images(); callbacks run on the event loop."""
+        urls = list(dict.fromkeys(urls))
         downloaded = {}
         total = len(urls)
-        for i, url in enumerate(urls):
-            filename = url.split("/")[-1]
-            save_path = output_dir / "Images" / filename
-            self.download_image(url, save_path)
-            downloaded[url] = save_path
-            if progress_callback:
-                progress_callback(i + 1, total)
+        paths = {url: output_dir / "Images" / url.split("/")[-1] for url in urls}
+        downloads = self.async_http.completed(
+            lambda url: self.download_image(url, paths[url]), urls, limit=max_workers
+        )
+        async with aclosing(downloads):
+            async for url, _ in downloads:
+                downloaded[url] = paths[url]
+                if item_callback:
+                    item_callback(url)
+                if progress_callback:
+                    progress_callback(len(downloaded), total)
         return downloaded
 
     def download_all_css(
@@ -45,16 +81,91 @@ class AssetsPlugin(Plugin):
         urls: list[str],
         output_dir: Path,
         progress_callback: Callable[[int, int], None] | None = None,
+        max_workers: int | None = None,
     ) -> dict[str, Path]:
-        downloaded = {}
+        """Download stylesheets concurrently, storing each distinct body once.
+
+        Returns the saved path for every URL; URLs whose content is
+        identical share one ``Styles/StyleNN.css`` file. Runs
+        download_all_css_async() to completion.
+        """
+        return asyncio.run(self.download_all_css_async(urls, output_dir, progress_callback, max_workers))
+
+    async def download_all_css_async(
+        self,
+        urls: list[str],
+        output_dir: Path,
+        progress_callback: Callable[[int, int], None] | None = None,
+        max_workers: int | None = None,
+    ) -> dict[str, Path]:
+        """Async variant of download_all_css(); callbacks run on the event loop."""
+        urls = list(dict.fromkeys(urls))
+        bodies = {}
         total = len(urls)
-        for i, url in enumerate(urls):
-            save_path = output_dir / "Styles" / f"Style{i:02d}.css"
-            self.download_css(url, save_path)
-            downloaded[url] = save_path
-            if progress_callback:
-                progress_callback(i + 1, total)
-        return downloaded
+        fetches = self.async_http.completed(self._fetch_css, urls, limit=max_workers)
+        async with aclosing(fetches):
+            async for url, body in fetches:
+                bodies[url] = body
+                if progress_callback:
+                    progress_callback(len(bodies), total)
+        return self._save_stylesheets(urls, bodies, output_dir)
+
+    def _fetch_css(self, url: str) -> str:
+        store = self._store()
+        if store is not None:
+            data = store.read(url)
+            if data is not None:
+                return data.decode()
+        text = self.http.get_text(url)
+        if store is not None:
+            store.add_bytes(url, text.encode())
+        return text
+
+    def _save_stylesheets(self, urls: list[str], bodies: dict[str, str], output_dir: Path) -> dict[str, Path]:
+        """Write each distinct body as StyleNN.css, numbered in order of first use."""
+        paths_by_digest: dict[str, Path] = {}
+        saved = {}
+        for url in urls:
+            body = bodies[url]
+            digest = hashlib.sha256(body.encode()).hexdigest()
+            path = paths_by_digest.get(digest)
+            if path is None:
+                path = output_dir / "Styles" / f"Style{len(paths_by_digest):02d}.css"
+                path.parent.mkdir(parents=True, exist_ok=True)
+                path.write_text(body)
+                paths_by_digest[digest] = path
+            saved[url] = path
+        return saved
 
     def get_cover_url(self, book_id: str) -> str:
-        return f"https://learning.oreilly.com/library/cover/{book_id}/"
+        return f"{config.BASE_URL}/library/cover/{book_id}/"
+
+    def cover_thumbnail(self, book_id: str, width: int) -> Path:
+        """Path to a JPEG of the book's cover at most ``width`` pixels wide.
+
+        The cover is downloaded once and kept under CACHE_DIR/covers with
+        each thumbnail made from it; concurrent requests share the work.
+        Needs Pillow (raises ImportError without it).
+        """
+        path = config.CACHE_DIR / "covers" / book_id / f"{width}w.jpg"
+        if path.exists():
+            return path
+        self.kernel["image_optimizer"].pil  # Fail before downloading when Pillow is missing
+
+        def make() -> Path:
+            if not path.exists():
+                thumbnail = self.kernel["image_optimizer"].thumbnail(self._cover_source(book_id), width)
+                write_atomic(path, thumbnail)
+            return path
+
+        return self._thumbnails.do(path, make)[0]
+
+    def _cover_source(self, book_id: str) -> bytes:
+        path = config.CACHE_DIR / "covers" / book_id / "source"
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            pass
+        data = self.http.get_bytes(self.get_cover_url(book_id))
+        write_atomic(path, data)
+        return data
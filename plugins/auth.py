@@ -3,7 +3,7 @@ from .base import Plugin
 
 class AuthPlugin(Plugin):
     def validate_session(self) -> bool:
-        response = self.http.get("/profile/", allow_redirects=False)
+        response = self.http.get("/profile/", use_cache=False, allow_redirects=False)
         if response.status_code != 200:
             return False
         if '"user_type":"Expired"' in response.text:
@@ -11,7 +11,7 @@ class AuthPlugin(Plugin):
         return True
 
     def get_status(self) -> dict:
-        response = self.http.get("/profile/", allow_redirects=False)
+        response = self.http.get("/profile/", use_cache=False, allow_redirects=False)
 
         if response.status_code != 200:
             return {"valid": False, "reason": "not_authenticated"}
@@ -9,3 +9,7 @@ class Plugin(ABC):
     @property
     def http(self):
         return self.kernel.http
+
+    @property
+    def async_http(self):
+        return self.kernel.async_http
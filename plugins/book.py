@@ -1,12 +1,164 @@
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import aclosing
+from typing import Callable
+
+from core.rate_limiter import METADATA
+from core.retry import RequestCancelled
+from core.ttl_cache import TTLCache
+from core.types import ResolvedBook
 from .base import Plugin
 import config
 
 
+# Fields of a search hit that the search API matches query words against.
+_SEARCHED_FIELDS = ("archive_id", "isbn", "title", "authors", "publishers", "description", "topics")
+_WORD_RE = re.compile(r"\w+")
+
+
+class BookNotFoundError(LookupError):
+    """The API has no book with the requested ID."""
+
+
+class SearchCancelled(Exception):
+    """A search was superseded before it went upstream."""
+
+
 class BookPlugin(Plugin):
+    def __init__(self):
+        self._metadata = TTLCache(
+            ttl=config.METADATA_CACHE_TTL,
+            directory=config.CACHE_DIR / "metadata",
+        )
+        self._searches = TTLCache(ttl=config.SEARCH_CACHE_TTL, maxsize=config.SEARCH_CACHE_SIZE)
+
     def fetch(self, book_id: str) -> dict:
-        search_data = self._fetch_search(book_id)
-        epub_data = self._fetch_epub(book_id)
+        """Book metadata, served from cache while fresh.
+
+        Raises BookNotFoundError for unknown IDs, which are cached too.
+        """
+        info = self._cached(book_id)
+        if info is not None:
+            return info
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            search = pool.submit(self.http.propagate(self._fetch_search), book_id)
+            epub = pool.submit(self.http.propagate(self._fetch_epub), book_id)
+            epub_data = self._check_found(book_id, epub.result)
+            search_data = search.result()
+        return self._remember(book_id, search_data, epub_data)
+
+    def resolve_many(
+        self,
+        identifiers: list[str],
+        max_workers: int | None = None,
+    ) -> list[ResolvedBook]:
+        """Resolve ISBNs or book IDs to books concurrently, one result per input.
+
+        ISBNs are searched for first, since a book's ID need not be its
+        ISBN, and fetched as a book ID only if no book matches. Anything
+        else is tried as a book ID first (using the metadata cache,
+        including cached misses), then searched for. Either way the first
+        book in the search results wins. Resolutions, including misses,
+        are kept in the metadata cache, so a rerun makes no requests.
+        Failures are reported per input instead of raised. Requests run
+        at metadata priority so a large batch never gets ahead of the UI.
+        Runs resolve_many_async() to completion.
+        """
+        return asyncio.run(self.resolve_many_async(identifiers, max_workers))
+
+    async def resolve_many_async(
+        self,
+        identifiers: list[str],
+        max_workers: int | None = None,
+    ) -> list[ResolvedBook]:
+        """Async variant of resolve_many()."""
+        unique = list(dict.fromkeys(_normalize_identifier(i) for i in identifiers))
+        resolved = {}
+        with self.http.priority(METADATA):
+            lookups = self.async_http.completed(self._resolve, unique, limit=max_workers)
+            async with aclosing(lookups):
+                async for identifier, result in lookups:
+                    resolved[identifier] = result
+        return [{**resolved[_normalize_identifier(i)], "input": i} for i in identifiers]
+
+    def _resolve(self, identifier: str) -> ResolvedBook:
+        if not identifier:
+            return ResolvedBook(input=identifier, status="error", book=None, error="Empty identifier")
+        key = f"resolved:{identifier}"
+        cached = self._metadata.get(key) if self._caching() else None
+        if cached is not None:
+            book = cached["book"]
+        else:
+            try:
+                book = self._lookup(identifier)
+            except Exception as e:
+                return ResolvedBook(input=identifier, status="error", book=None, error=str(e))
+            if self._caching():
+                ttl = None if book is not None else config.METADATA_NEGATIVE_TTL
+                self._metadata.set(key, {"book": book}, ttl=ttl)
+        if book is not None:
+            return ResolvedBook(input=identifier, status="resolved", book=dict(book), error=None)
+        return ResolvedBook(
+            input=identifier, status="not_found", book=None, error=f"No book found for {identifier}"
+        )
+
+    def _lookup(self, identifier: str) -> dict | None:
+        lookups = [self._search_first, self._fetch_book]
+        if not _is_isbn(identifier):
+            lookups.reverse()
+        for lookup in lookups:
+            book = lookup(identifier)
+            if book is not None:
+                return book
+        return None
+
+    def _fetch_book(self, book_id: str) -> dict | None:
+        try:
+            info = self.fetch(book_id)
+        except BookNotFoundError:
+            return None
+        return {key: info.get(key) for key in ("id", "title", "authors", "publishers", "cover_url")}
+
+    def _search_first(self, query: str) -> dict | None:
+        results = self.search(query)
+        return results[0] if results else None
+
+    def _caching(self) -> bool:
+        """False while a cassette is active, so every request reaches it."""
+        return self.http.cassette is None
+
+    def _cached(self, book_id: str) -> dict | None:
+        if not self._caching():
+            return None
+        info = self._metadata.get(book_id)
+        if info is None:
+            return None
+        if info.get("not_found"):
+            raise BookNotFoundError(f"Book not found: {book_id}")
+        return dict(info)
+
+    def _check_found(self, book_id: str, result) -> dict:
+        """Return ``result()``, caching a 404 from the API as a missing book."""
+        try:
+            return result()
+        except Exception as e:
+            response = getattr(e, "response", None)
+            status = getattr(response, "status_code", None)
+            if status == 404:
+                if self._caching():
+                    self._metadata.set(book_id, {"not_found": True}, ttl=config.METADATA_NEGATIVE_TTL)
+                raise BookNotFoundError(f"Book not found: {book_id}") from e
+            raise
 
+    def _remember(self, book_id: str, search_data: dict, epub_data: dict) -> dict:
+        info = self._build_info(book_id, search_data, epub_data)
+        if self._caching():
+            self._metadata.set(book_id, info)
+        return dict(info)
+
+    def _build_info(self, book_id: str, search_data: dict, epub_data: dict) -> dict:
         return {
             "id": book_id,
             "ourn": epub_data.get("ourn"),
@@ -25,30 +177,125 @@ class BookPlugin(Plugin):
             "files_url": epub_data.get("files"),
         }
 
+    def _search_url(self, query: str, limit: int) -> str:
+        return f"{config.API_V2}/search/?query={query}&limit={limit}"
+
+    def _epub_url(self, book_id: str) -> str:
+        return f"{config.API_V2}/epubs/urn:orm:book:{book_id}/"
+
     def _fetch_search(self, book_id: str) -> dict:
-        url = f"{config.API_V2}/search/?query={book_id}&limit=1"
-        data = self.http.get_json(url)
+        data = self.http.get_json(self._search_url(book_id, 1))
         results = data.get("results", [])
         if not results:
             return {}
         return results[0]
 
     def _fetch_epub(self, book_id: str) -> dict:
-        url = f"{config.API_V2}/epubs/urn:orm:book:{book_id}/"
-        return self.http.get_json(url)
-
-    def search(self, query: str, limit: int = 10) -> list[dict]:
-        url = f"{config.API_V2}/search/?query={query}&limit={limit}"
-        data = self.http.get_json(url)
-        results = []
-        for item in data.get("results", []):
-            if item.get("content_format") != "book":
+        return self.http.get_json(self._epub_url(book_id))
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        cancelled: Callable[[], bool] | None = None,
+    ) -> list[dict]:
+        """Search for books, answering from the search cache when possible.
+
+        ``cancelled`` is checked while the request waits for the rate
+        limiter and again just before it is sent; if it returns True the
+        search raises SearchCancelled instead.
+        """
+        query = " ".join(query.split())
+        results = self._cached_search(query, limit)
+        if results is not None:
+            return results
+        if cancelled and cancelled():
+            raise SearchCancelled(query)
+        try:
+            with self.http.cancellation(cancelled):
+                data = self.http.get_json(self._search_url(query, limit))
+        except RequestCancelled as e:
+            raise SearchCancelled(query) from e
+        return self._remember_search(query, limit, data)
+
+    def _search_key(self, query: str, limit: int) -> str:
+        return f"{limit}:{query.lower()}"
+
+    def _cached_search(self, query: str, limit: int) -> list[dict] | None:
+        """Cached results for ``query``, or refined from a cached shorter query.
+
+        When a cached query returned fewer results than its limit it saw
+        every match. Adding words to it can only narrow that set, so the
+        longer query is answered locally by keeping the results that have
+        each added word as a whole word in one of _SEARCHED_FIELDS. Added
+        words containing punctuation always go upstream, since how the API
+        splits them is unknown.
+        """
+        if not self._caching():
+            return None
+        entry = self._searches.get(self._search_key(query, limit))
+        if entry is not None:
+            return list(entry["results"])
+
+        words = query.lower().split()
+        for n in range(len(words) - 1, 0, -1):
+            entry = self._searches.get(self._search_key(" ".join(words[:n]), limit))
+            if entry is None or not entry["exhaustive"]:
                 continue
-            results.append({
-                "id": item.get("archive_id"),
-                "title": item.get("title"),
-                "authors": item.get("authors", []),
-                "cover_url": item.get("cover_url"),
-                "publishers": item.get("publishers", []),
+            extra = words[n:]
+            if not all(_WORD_RE.fullmatch(w) for w in extra):
+                return None
+            kept = [i for i, found in enumerate(entry["words"]) if all(w in found for w in extra)]
+            refined = {
+                "results": [entry["results"][i] for i in kept],
+                "words": [entry["words"][i] for i in kept],
+                "exhaustive": True,
+            }
+            self._searches.set(self._search_key(query, limit), refined)
+            return list(refined["results"])
+        return None
+
+    def _remember_search(self, query: str, limit: int, data: dict) -> list[dict]:
+        items = [item for item in data.get("results", []) if item.get("content_format") == "book"]
+        results = [self._parse_search_result(item) for item in items]
+        if self._caching():
+            self._searches.set(self._search_key(query, limit), {
+                "results": results,
+                "words": [_search_words(item) for item in items],
+                "exhaustive": len(data.get("results", [])) < limit,
             })
-        return results
+        return list(results)
+
+    def _parse_search_result(self, item: dict) -> dict:
+        return {
+            "id": item.get("archive_id"),
+            "title": item.get("title"),
+            "authors": item.get("authors", []),
+            "cover_url": item.get("cover_url"),
+            "publishers": item.get("publishers", []),
+        }
+
+
+def _normalize_identifier(identifier: str) -> str:
+    """Strip whitespace, and the hyphens from hyphenated ISBNs."""
+    identifier = identifier.strip()
+    if re.fullmatch(r"[0-9Xx][0-9Xx -]{8,}", identifier):
+        return re.sub(r"[ -]", "", identifier).upper()
+    return identifier
+
+
+def _is_isbn(identifier: str) -> bool:
+    """Whether a normalized identifier looks like an ISBN-10 or ISBN-13."""
+    return re.fullmatch(r"\d{9}[\dX]|97[89]\d{10}", identifier) is not None
+
+
+def _search_words(item: dict) -> frozenset[str]:
+    """Lower-cased words of a raw search hit's _SEARCHED_FIELDS."""
+    words = set()
+    for field in _SEARCHED_FIELDS:
+        value = item.get(field) or []
+        for part in [value] if isinstance(value, str) else value:
+            if isinstance(part, dict):
+                part = part.get("name") or ""
+            words.update(_WORD_RE.findall(str(part).lower()))
+    return frozenset(words)
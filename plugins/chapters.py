@@ -1,3 +1,7 @@
+import asyncio
+from contextlib import aclosing
+from typing import Callable
+
 from .base import Plugin
 from core.types import ChapterInfo
 import config
@@ -7,34 +11,74 @@ class ChaptersPlugin(Plugin):
     """Plugin for fetching book chapters and their content."""
 
     def fetch_list(self, book_id: str) -> list[ChapterInfo]:
-        """Fetch list of chapters for a book."""
-        url = f"{config.API_V2}/epub-chapters/?epub_identifier=urn:orm:book:{book_id}"
-        chapters: list[ChapterInfo] = []
-
-        while url:
-            data = self.http.get_json(url)
-            for ch in data.get("results", []):
-                chapters.append(ChapterInfo(
-                    ourn=ch.get("ourn", ""),
-                    title=ch.get("title", ""),
-                    filename=self._extract_filename(ch.get("reference_id", "")),
-                    content_url=ch.get("content_url", ""),
-                    images=ch.get("related_assets", {}).get("images", []),
-                    stylesheets=ch.get("related_assets", {}).get("stylesheets", []),
-                    virtual_pages=ch.get("virtual_pages"),
-                    minutes_required=ch.get("minutes_required"),
-                ))
-            url = data.get("next")
-
+        """Fetch list of chapters for a book (pages are fetched concurrently)."""
+        pages = self.http.get_pages(self._list_url(book_id))
+        chapters = [self._parse_chapter(ch) for page in pages for ch in page.get("results", [])]
         return self._reorder_cover_first(chapters)
 
+    def _list_url(self, book_id: str) -> str:
+        return f"{config.API_V2}/epub-chapters/?epub_identifier=urn:orm:book:{book_id}"
+
+    def _parse_chapter(self, ch: dict) -> ChapterInfo:
+        return ChapterInfo(
+            ourn=ch.get("ourn", ""),
+            title=ch.get("title", ""),
+            filename=self._extract_filename(ch.get("reference_id", "")),
+            content_url=ch.get("content_url", ""),
+            images=ch.get("related_assets", {}).get("images", []),
+            stylesheets=ch.get("related_assets", {}).get("stylesheets", []),
+            virtual_pages=ch.get("virtual_pages"),
+            minutes_required=ch.get("minutes_required"),
+        )
+
     def fetch_toc(self, book_id: str) -> list[dict]:
-        url = f"{config.API_V2}/epubs/urn:orm:book:{book_id}/table-of-contents/"
-        return self.http.get_json(url)
+        return self.http.get_json(self._toc_url(book_id))
+
+    def _toc_url(self, book_id: str) -> str:
+        return f"{config.API_V2}/epubs/urn:orm:book:{book_id}/table-of-contents/"
 
     def fetch_content(self, content_url: str) -> str:
         return self.http.get_text(content_url)
 
+    def fetch_contents(
+        self,
+        content_urls: list[str],
+        max_workers: int | None = None,
+        progress_callback: Callable[[int, int], None] | None = None,
+        item_callback: Callable[[str], None] | None = None,
+    ) -> list[str]:
+        """Fetch several chapters concurrently, returning bodies in input order.
+
+        Callbacks run in the calling thread as each chapter arrives;
+        ``item_callback`` receives the URL that just completed. Runs
+        fetch_contents_async() to completion.
+        """
+        return asyncio.run(self.fetch_contents_async(content_urls, max_workers, progress_callback, item_callback))
+
+    async def fetch_contents_async(
+        self,
+        content_urls: list[str],
+        max_workers: int | None = None,
+        progress_callback: Callable[[int, int], None] | None = None,
+        item_callback: Callable[[str], None] | None = None,
+    ) -> list[str]:
+        """Async variant of fetch_contents(); callbacks run on the event loop."""
+        contents: list[str] = [""] * len(content_urls)
+        total = len(content_urls)
+        done = 0
+        fetches = self.async_http.completed(
+            lambda item: self.fetch_content(item[1]), enumerate(content_urls), limit=max_workers
+        )
+        async with aclosing(fetches):
+            async for (index, url), content in fetches:
+                contents[index] = content
+                done += 1
+                if item_callback:
+                    item_callback(url)
+                if progress_callback:
+                    progress_callback(done, total)
+        return contents
+
     def _extract_filename(self, reference_id: str) -> str:
         if "-/" in reference_id:
             return reference_id.split("-/")[1]
@@ -54,3 +98,4 @@ class ChaptersPlugin(Plugin):
                 other_chapters.append(ch)
 
         return cover_chapters + other_chapters
+
@@ -5,7 +5,7 @@ import re
 from dataclasses import dataclass
 from pathlib import Path
 
-from core.text_extractor import TextExtractor
+from core.chapter_document import ChapterDocument
 from utils.files import sanitize_filename
 
 from .base import Plugin
@@ -26,14 +26,11 @@ class ChunkingPlugin(Plugin):
     SENTENCE_ENDINGS = re.compile(r"[.!?]\s+")
     PARAGRAPH_BREAK = re.compile(r"\n\n+")
 
-    def __init__(self):
-        self._extractor = TextExtractor()
-
     def generate(
         self,
         book_dir: Path,
         book_metadata: dict,
-        chapters_data: list[tuple[str, str, str]],
+        chapters_data: list[ChapterDocument],
         config: ChunkConfig | None = None,
     ) -> Path:
         """Generate chunked JSONL export."""
@@ -54,18 +51,16 @@ class ChunkingPlugin(Plugin):
 
     def chunk_book(
         self,
-        chapters_data: list[tuple[str, str, str]],
+        chapters_data: list[ChapterDocument],
         config: ChunkConfig,
     ) -> list[dict]:
         """Chunk an entire book, preserving chapter metadata."""
         all_chunks = []
         chunk_id = 0
 
-        for chapter_index, (filename, title, html) in enumerate(chapters_data):
-            text = self._extractor.extract_text_only(html)
-
+        for chapter_index, chapter in enumerate(chapters_data):
             chapter_chunks = self.chunk_text(
-                text,
+                chapter.text,
                 config.chunk_size,
                 config.overlap,
                 config.respect_boundaries,
@@ -74,8 +69,8 @@ class ChunkingPlugin(Plugin):
             for chunk in chapter_chunks:
                 chunk["chunk_id"] = chunk_id
                 chunk["chapter_index"] = chapter_index
-                chunk["chapter_title"] = title
-                chunk["chapter_filename"] = filename
+                chunk["chapter_title"] = chapter.title
+                chunk["chapter_filename"] = chapter.filename
                 all_chunks.append(chunk)
                 chunk_id += 1
 
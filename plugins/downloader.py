@@ -1,14 +1,21 @@
 """Download orchestration plugin."""
 
 import shutil
-import time
 import logging
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Callable
 
+import config
+from core.chapter_document import ChapterDocument
+from core.rate_limiter import BULK
+from core.ttl_cache import TTLCache
 from plugins.base import Plugin
 from plugins.chunking import ChunkConfig
+from plugins.planner import CHAPTER, IMAGE, STYLESHEET, PlanProgress
+from utils import css_image_names
 
 # ロガーの設定
 logger = logging.getLogger(__name__)
@@ -44,6 +51,11 @@ class DownloaderPlugin(Plugin):
     FORMAT_ALIASES = {"md": "markdown", "txt": "plaintext"}
     BOOK_ONLY_FORMATS = frozenset(["epub", "chunks"])
 
+    def __init__(self):
+        self._prefetched = TTLCache(ttl=config.PREFETCH_TTL)
+        self._chapter_lists = TTLCache(ttl=config.PREFETCH_TTL)
+        self._prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="prefetch")
+
     @classmethod
     def parse_formats(cls, format_input: str | list[str]) -> list[str]:
         if isinstance(format_input, list):
@@ -119,6 +131,92 @@ class DownloaderPlugin(Plugin):
         chunk_config: ChunkConfig | None = None,
         progress_callback: Callable[[DownloadProgress], None] | None = None,
         cancel_check: Callable[[], bool] | None = None,
+        deadline: float | None = None,
+    ) -> DownloadResult:
+        """Download a book; ``deadline`` caps the seconds spent on upstream requests."""
+        with self._cassette(book_id), self.http.deadline(deadline):
+            return self._download(
+                book_id, output_dir, formats, selected_chapters, skip_images,
+                chunk_config, progress_callback, cancel_check,
+            )
+
+    def prefetch(self, book_id: str) -> None:
+        """Start fetching the metadata, chapter list and TOC download() needs.
+
+        Runs in the background at bulk priority, so it only uses spare
+        request budget; the result is kept for PREFETCH_TTL seconds.
+        """
+        if not config.PREFETCH_ENABLED:
+            return
+        pending: Future | None = self._prefetched.get(book_id)
+        if pending is not None and not (pending.done() and pending.exception() is not None):
+            return
+        self._prefetched.set(book_id, self._prefetch_pool.submit(self._prefetch, book_id))
+
+    def _prefetch(self, book_id: str) -> tuple[dict, list[dict], list[dict]]:
+        with self.http.priority(BULK):
+            book_info = self.kernel["book"].fetch(book_id)
+            # The chapter list last, so one the web UI asked for at the
+            # same time has usually arrived and is reused.
+            toc = self.kernel["chapters"].fetch_toc(book_id)
+            chapters = self.chapter_list(book_id)
+        return book_info, chapters, toc
+
+    def chapter_list(self, book_id: str) -> list[dict]:
+        """The book's chapter list, shared with a prefetch of the same book.
+
+        Fetched at the caller's priority unless a prefetch or an earlier
+        call got it within PREFETCH_TTL seconds. Under a cassette every
+        call fetches, so the traffic is recorded.
+        """
+        chapters_plugin = self.kernel["chapters"]
+        if self.http.cassette is not None:
+            return chapters_plugin.fetch_list(book_id)
+        chapters = self._chapter_lists.get(book_id)
+        if chapters is None:
+            chapters = chapters_plugin.fetch_list(book_id)
+            self._chapter_lists.set(book_id, chapters)
+        return chapters
+
+    def _take_prefetched(self, book_id: str) -> tuple[dict, list[dict], list[dict]] | None:
+        """Return a finished prefetch for ``book_id`` and drop it from the cache.
+
+        One still in flight is not waited for: download() fetches the same
+        URLs itself at its own priority rather than queueing behind the
+        bulk-priority prefetch.
+        Under a cassette nothing is taken, so the traffic is recorded.
+        """
+        if self.http.cassette is not None:
+            return None
+        future: Future | None = self._prefetched.get(book_id)
+        if future is None:
+            return None
+        self._prefetched.delete(book_id)
+        if not future.done() or future.exception() is not None:
+            return None
+        return future.result()
+
+    def _cassette(self, book_id: str):
+        """Record or replay this book's upstream traffic when CASSETTE_MODE is set."""
+        if not config.CASSETTE_MODE:
+            return nullcontext()
+        return self.http.use_cassette(
+            config.CASSETTE_DIR / f"{book_id}.jsonl.gz",
+            config.CASSETTE_MODE,
+            latency=config.CASSETTE_LATENCY,
+            bandwidth=config.CASSETTE_BANDWIDTH,
+        )
+
+    def _download(
+        self,
+        book_id: str,
+        output_dir: Path,
+        formats: list[str] | None,
+        selected_chapters: list[int] | None,
+        skip_images: bool,
+        chunk_config: ChunkConfig | None,
+        progress_callback: Callable[[DownloadProgress], None] | None,
+        cancel_check: Callable[[], bool] | None,
     ) -> DownloadResult:
         if formats is None:
             formats = ["epub"]
@@ -141,12 +239,212 @@ class DownloaderPlugin(Plugin):
         assets_plugin = self.kernel["assets"]
         html_processor = self.kernel["html_processor"]
         output_plugin = self.kernel["output"]
+        planner = self.kernel["planner"]
 
-        # Phase 1: Fetch metadata
-        report("starting", 0)
-        book_info = book_plugin.fetch(book_id)
+        # Phases 1-2 are usually done already if the book was opened in the UI.
+        prefetched = self._take_prefetched(book_id)
+        if prefetched is not None:
+            report("fetching_chapters", 10)
+            book_info, chapter_list, toc = prefetched
+        else:
+            # Phase 1: Fetch metadata
+            report("starting", 0)
+            book_info = book_plugin.fetch(book_id)
 
-        # Phase 2: Fetch chapters list
-        report("fetching_chapters", 10)
-        
-        # ---
\ No newline at end of file
+            # Phase 2: Fetch chapters list
+            report("fetching_chapters", 10)
+            chapter_list = chapters_plugin.fetch_list(book_id)
+            toc = chapters_plugin.fetch_toc(book_id)
+
+        # --- Flatten nested chapters so children are downloaded as well ---
+        chapters = self._flatten_chapters(chapter_list)
+
+        if selected_chapters is not None:
+            chapters = [chapters[i] for i in selected_chapters if 0 <= i < len(chapters)]
+
+        # One deduplicated list of every file to fetch, with sizes from the
+        # book's file manifest for byte-accurate progress and ordering. A
+        # selection of a few chapters doesn't page through the whole manifest.
+        plan = planner.plan(
+            book_info,
+            chapters,
+            include_images=not skip_images,
+            fetch_manifest=selected_chapters is None or len(chapters) >= config.PLAN_MANIFEST_MIN_CHAPTERS,
+        )
+
+        book_dir = output_plugin.create_book_dir(
+            output_dir, book_id, book_info.get("title"), book_info.get("authors")
+        )
+        oebps = output_plugin.get_oebps_dir(book_dir)
+
+        # Phase 3: Stylesheets
+        report("downloading_css", 15)
+        css_urls = plan.urls(STYLESHEET)
+        css_paths = assets_plugin.download_all_css(css_urls, oebps)
+        # Identical stylesheets share a file, so list each StyleNN.css once.
+        css_files = [f"Styles/{p.name}" for p in dict.fromkeys(css_paths.values())]
+
+        # Phase 4: Chapter content (fetched largest first, processed in order)
+        # Progress and ETA cover chapters and images together, by bytes.
+        image_urls = plan.largest_first(plan.urls(IMAGE))
+        content_urls = plan.largest_first(plan.urls(CHAPTER))
+        progress = PlanProgress(plan, content_urls + image_urls)
+
+        def on_item(url: str):
+            progress.advance(url)
+
+        def on_chapter(done: int, total: int):
+            if check_cancel():
+                raise RuntimeError("Download cancelled")
+            report("downloading", 20 + int(progress.fraction * 60), eta_seconds=progress.eta_seconds(),
+                   current_chapter=done, total_chapters=total)
+
+        contents = dict(zip(content_urls, chapters_plugin.fetch_contents(
+            content_urls, progress_callback=on_chapter, item_callback=on_item
+        )))
+
+        # Each chapter is parsed once here; every output format renders
+        # from the resulting ChapterDocument.
+        chapters_data = []
+        referenced = set()
+        for ch in chapters:
+            content, images = html_processor.process(contents[ch["content_url"]], book_id, skip_images)
+            chapters_data.append(ChapterDocument(ch["filename"], ch["title"], content))
+            referenced.update(src.split("/")[-1] for src in images)
+            referenced.update(css_image_names(content))
+
+        # Only fetch images the chapters or stylesheets actually show;
+        # related_assets may list more. The cover image is kept for the
+        # EPUB metadata.
+        for css_path in set(css_paths.values()):
+            referenced.update(css_image_names(css_path.read_text()))
+        referenced.add(self._find_cover_image(chapters))
+        unused = [url for url in image_urls if url.split("/")[-1] not in referenced]
+        if unused:
+            unused_set = set(unused)
+            image_urls = [url for url in image_urls if url not in unused_set]
+            progress.discard(unused)
+
+        # Phase 5: Images
+        if image_urls:
+            def on_image(done: int, total: int):
+                if check_cancel():
+                    raise RuntimeError("Download cancelled")
+                report("downloading_images", 20 + int(progress.fraction * 60),
+                       message=f"Image {done}/{total}", eta_seconds=progress.eta_seconds())
+
+            assets_plugin.download_all_images(
+                image_urls, oebps, progress_callback=on_image, item_callback=on_item
+            )
+
+        # Optional: shrink images; converted files get a new extension.
+        renames = {}
+        if config.IMAGE_OPTIMIZE and image_urls:
+            report("optimizing_images", 80)
+            optimizer = self.kernel["image_optimizer"]
+            renames = optimizer.optimize_dir(oebps / "Images")
+            optimizer.rewrite_stylesheets(css_paths.values(), renames)
+            chapters_data = [
+                ChapterDocument(doc.filename, doc.title, optimizer.rewrite_references(doc.html, renames))
+                for doc in chapters_data
+            ]
+
+        for doc in chapters_data:
+            xhtml_path = oebps / doc.filename.replace(".html", ".xhtml")
+            xhtml_path.parent.mkdir(parents=True, exist_ok=True)
+            xhtml_path.write_text(html_processor.wrap_xhtml(doc.html, css_files, doc.title))
+
+        # Phase 6: Output formats
+        report("generating", 80)
+        cover_image = self._find_cover_image(chapters)
+        cover_image = renames.get(cover_image, cover_image)
+        files = self._generate_formats(
+            formats, book_info, chapters, chapters_data, toc, book_dir,
+            css_files, cover_image, chunk_config,
+        )
+
+        if oebps.exists():
+            shutil.rmtree(oebps)
+
+        self._log_http_stats(book_id)
+        report("completed", 100)
+        return DownloadResult(
+            book_id=book_id,
+            title=book_info.get("title") or book_id,
+            output_dir=book_dir,
+            files=files,
+            chapters_count=len(chapters),
+        )
+
+    def _log_http_stats(self, book_id: str):
+        """Log cumulative upstream statistics so slow jobs can be diagnosed."""
+        for endpoint, s in self.http.stats.snapshot().items():
+            logger.info(
+                "[%s] HTTP %s: %d requests, %d errors, %d bytes, avg %.2fs, p95 %.2fs, limiter wait %.1fs",
+                book_id, endpoint, s["requests"], s["errors"], s["bytes"],
+                s["latency_avg"] or 0, s["latency_p95"] or 0, s["limiter_wait"],
+            )
+
+    def _find_cover_image(self, chapters: list[dict]) -> str | None:
+        """Return the filename of the cover chapter's first image, if any."""
+        for ch in chapters:
+            if "cover" in ch["filename"].lower() or "cover" in ch["title"].lower():
+                if ch["images"]:
+                    return ch["images"][0].split("/")[-1]
+        return None
+
+    def _generate_formats(
+        self,
+        formats: list[str],
+        book_info: dict,
+        chapters: list[dict],
+        chapters_data: list[ChapterDocument],
+        toc: list[dict],
+        book_dir: Path,
+        css_files: list[str],
+        cover_image: str | None,
+        chunk_config: ChunkConfig | None,
+    ) -> dict:
+        """Render each requested format. EPUB runs last since it removes the build files."""
+        files = {}
+        oebps = book_dir / "OEBPS"
+
+        for fmt in formats:
+            if fmt in ("markdown", "markdown-chapters"):
+                self.kernel["markdown"].generate_book(book_info, chapters_data, book_dir)
+                md_dir = book_dir / "Markdown"
+                if (oebps / "Images").exists():
+                    shutil.copytree(oebps / "Images", md_dir / "Images", dirs_exist_ok=True)
+                files["markdown"] = str(md_dir)
+            elif fmt == "pdf":
+                path = self.kernel["pdf"].generate(
+                    book_info, chapters, toc, book_dir, css_files, cover_image,
+                    documents=chapters_data,
+                )
+                files["pdf"] = str(path)
+            elif fmt == "pdf-chapters":
+                paths = self.kernel["pdf"].generate_chapters(
+                    book_info, chapters, book_dir, css_files, documents=chapters_data
+                )
+                files["pdf"] = [str(p) for p in paths]
+            elif fmt in ("plaintext", "plaintext-chapters"):
+                path = self.kernel["plaintext"].generate(
+                    book_dir, book_info, chapters_data, single_file=fmt == "plaintext"
+                )
+                files["plaintext"] = str(path)
+            elif fmt == "json":
+                path = self.kernel["json_export"].generate(
+                    book_dir, book_info, chapters_data, include_jsonl="jsonl" in formats
+                )
+                files["json"] = str(path)
+            elif fmt == "chunks":
+                path = self.kernel["chunking"].generate(book_dir, book_info, chapters_data, chunk_config)
+                files["chunks"] = str(path)
+
+        if "epub" in formats:
+            path = self.kernel["epub"].generate(
+                book_info, chapters, toc, book_dir, css_files, cover_image
+            )
+            files["epub"] = str(path)
+
+        return files
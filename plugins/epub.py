@@ -6,7 +6,7 @@ from datetime import datetime, timezone
 from pathlib import Path
 
 from .base import Plugin
-from utils import sanitize_filename, slugify
+from utils import css_image_names, sanitize_filename, slugify
 
 
 class EpubPlugin(Plugin):
@@ -25,20 +25,36 @@ class EpubPlugin(Plugin):
 
         self._write_mimetype(output_dir)
         self._write_container_xml(output_dir)
-        self._write_content_opf(oebps, book_info, chapters, css_files, cover_image)
+        images = self._referenced_images(oebps, chapters, cover_image)
+        self._write_content_opf(oebps, book_info, chapters, css_files, cover_image, images)
         self._write_toc_ncx(oebps, book_info, toc)
         self._write_nav_xhtml(oebps, book_info, toc)
 
         # Use sanitized title for epub filename
         epub_name = sanitize_filename(book_info.get("title", book_info["id"]))
         epub_path = output_dir / f"{epub_name}.epub"
-        self._create_epub_zip(output_dir, epub_path)
+        self._create_epub_zip(output_dir, epub_path, images)
 
         # Clean up build artifacts
         self._cleanup_build_artifacts(output_dir)
 
         return epub_path
 
+    def _referenced_images(self, oebps: Path, chapters: list[dict], cover_image: str | None) -> set[str]:
+        """Names of the files in Images/ that a chapter, a stylesheet or the cover uses."""
+        images = {cover_image} if cover_image else set()
+        for ch in chapters:
+            xhtml_path = oebps / ch["filename"].replace(".html", ".xhtml")
+            if xhtml_path.exists():
+                xhtml = xhtml_path.read_text()
+                images.update(re.findall(r"Images/([^\"'\s)]+)", xhtml))
+                images.update(css_image_names(xhtml))
+        styles_dir = oebps / "Styles"
+        if styles_dir.exists():
+            for css_path in styles_dir.glob("*.css"):
+                images.update(css_image_names(css_path.read_text()))
+        return images
+
     def _cleanup_build_artifacts(self, output_dir: Path):
         """Remove intermediate EPUB build files after ZIP creation."""
         artifacts = [
@@ -71,6 +87,7 @@ class EpubPlugin(Plugin):
         chapters: list[dict],
         css_files: list[str],
         cover_image: str | None,
+        images: set[str],
     ):
         title = html.escape(book_info.get("title", "Unknown"))
         authors = book_info.get("authors", [])
@@ -111,7 +128,9 @@ class EpubPlugin(Plugin):
 
         images_dir = oebps / "Images"
         if images_dir.exists():
-            for img_file in images_dir.iterdir():
+            for img_file in sorted(images_dir.iterdir()):
+                if img_file.name not in images:
+                    continue  # Unreferenced, or an in-progress download temp file
                 img_id = f"img_{img_file.stem}"
                 media_type = self._get_image_media_type(img_file.suffix)
                 properties = ""
@@ -273,13 +292,18 @@ class EpubPlugin(Plugin):
         }
         return types.get(suffix.lower(), "application/octet-stream")
 
-    def _create_epub_zip(self, output_dir: Path, epub_path: Path):
+    def _create_epub_zip(self, output_dir: Path, epub_path: Path, images: set[str]):
+        """Zip the EPUB parts, leaving out images that no chapter references."""
+        images_dir = output_dir / "OEBPS" / "Images"
         with zipfile.ZipFile(epub_path, "w", zipfile.ZIP_DEFLATED) as zf:
             mimetype_path = output_dir / "mimetype"
             zf.write(mimetype_path, "mimetype", compress_type=zipfile.ZIP_STORED)
 
-            for file_path in output_dir.rglob("*"):
-                if file_path.is_file() and file_path.name != "mimetype":
-                    arcname = file_path.relative_to(output_dir)
-                    if not str(arcname).endswith(".epub"):
-                        zf.write(file_path, arcname)
+            # Other formats are written to output_dir too; only take EPUB parts.
+            for part in ("META-INF", "OEBPS"):
+                for file_path in sorted((output_dir / part).rglob("*")):
+                    if not file_path.is_file() or file_path.name.startswith("."):
+                        continue
+                    if file_path.parent == images_dir and file_path.name not in images:
+                        continue
+                    zf.write(file_path, file_path.relative_to(output_dir))
@@ -1,10 +1,53 @@
 import re
 from bs4 import BeautifulSoup
+from lxml import etree
+
+import config
 from .base import Plugin
 
+# Serialization rules of BeautifulSoup's default ("minimal") formatter, so
+# both processor modes produce the same markup.
+_VOID_TAGS = frozenset([
+    "area", "base", "br", "col", "embed", "hr", "img", "input", "keygen", "link",
+    "menuitem", "meta", "param", "source", "track", "wbr", "basefont", "bgsound",
+    "command", "frame", "image", "isindex", "nextid", "spacer",
+])
+_RAW_TEXT_TAGS = frozenset(["script", "style"])
+_PRESERVE_WHITESPACE_TAGS = frozenset(["pre", "textarea"])
+_ASCII_SPACES = frozenset("\x20\x0a\x09\x0c\x0d")
+_CHARSET_RE = re.compile(r"((^|;)\s*charset=)([^;]*)", re.M)
+_LIST_ATTRIBUTES = {
+    "*": frozenset(["class", "accesskey", "dropzone"]),
+    "a": frozenset(["rel", "rev"]),
+    "link": frozenset(["rel", "rev"]),
+    "td": frozenset(["headers"]),
+    "th": frozenset(["headers"]),
+    "form": frozenset(["accept-charset"]),
+    "object": frozenset(["archive"]),
+    "area": frozenset(["rel"]),
+    "icon": frozenset(["sizes"]),
+    "iframe": frozenset(["sandbox"]),
+    "output": frozenset(["for"]),
+}
+_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;"})
+
 
 class HtmlProcessorPlugin(Plugin):
     def process(self, html: str, book_id: str, skip_images: bool = False) -> tuple[str, list[str]]:
+        """Extract the chapter body, rewriting image and link targets for the EPUB layout.
+
+        Returns the body markup and the original ``src`` of every image kept.
+        HTML_PROCESSOR = "bs4" (the default) runs the BeautifulSoup passes
+        below; "lxml" does the rewrites in one pass over lxml's parse events
+        and falls back to bs4 when the document has no body.
+        """
+        if config.HTML_PROCESSOR == "lxml":
+            result = self._process_lxml(html, book_id, skip_images)
+            if result is not None:
+                return result
+        return self._process_bs4(html, book_id, skip_images)
+
+    def _process_bs4(self, html: str, book_id: str, skip_images: bool) -> tuple[str, list[str]]:
         soup = BeautifulSoup(html, "lxml")
         images_found = []
 
@@ -25,6 +68,15 @@ class HtmlProcessorPlugin(Plugin):
 
         return str(content_div), images_found
 
+    def _process_lxml(self, html: str, book_id: str, skip_images: bool) -> tuple[str, list[str]] | None:
+        """Single-pass variant of _process_bs4(); None if the document has no body."""
+        parser = etree.HTMLParser(target=_SinglePassRewriter(book_id, skip_images))
+        try:
+            parser.feed(html)
+            return parser.close()
+        except etree.XMLSyntaxError:
+            return None
+
     def _remove_images(self, soup) -> None:
         """Remove all img tags from content"""
         for img in soup.find_all("img"):
@@ -58,22 +110,7 @@ class HtmlProcessorPlugin(Plugin):
 
     def _rewrite_href_links(self, soup, book_id: str):
         for a in soup.find_all("a", href=True):
-            href = a["href"]
-
-            if href.startswith("mailto:"):
-                continue
-
-            if href.startswith(("http://", "https://")):
-                if book_id in href:
-                    path = href.split(book_id)[-1].lstrip("/")
-                    href = path
-                else:
-                    continue
-
-            if href.endswith(".html"):
-                href = href.replace(".html", ".xhtml")
-
-            a["href"] = href
+            a["href"] = _rewrite_href(a["href"], book_id)
 
     def _handle_data_template_styles(self, soup):
         for style in soup.find_all("style"):
@@ -123,3 +160,217 @@ body{{margin:1em;background-color:transparent!important;}}
                     return img.get("src")
 
         return None
+
+
+def _rewrite_href(href: str, book_id: str) -> str:
+    """Point links into this book at the local .xhtml files; leave others alone."""
+    if href.startswith("mailto:"):
+        return href
+
+    if href.startswith(("http://", "https://")):
+        if book_id in href:
+            href = href.split(book_id)[-1].lstrip("/")
+        else:
+            return href
+
+    if href.endswith(".html"):
+        href = href.replace(".html", ".xhtml")
+    return href
+
+
+def _svg_image_href(attrs: dict) -> str | None:
+    return attrs.get("href") or attrs.get("xlink:href")
+
+
+class _SinglePassRewriter:
+    """lxml parser target that rewrites and serializes the chapter as it is parsed.
+
+    Mirrors HtmlProcessorPlugin._process_bs4(): output comes from the first
+    ``div#sbo-rt-content``, or from ``<body>`` if there is none. Each <svg>
+    is buffered until it is known whether an <img> replaces it.
+    """
+
+    def __init__(self, book_id: str, skip_images: bool):
+        self.book_id = book_id
+        self.skip_images = skip_images
+        self.capturing = None  # "body" or "content"
+        self.result: tuple[str, list[str]] | None = None
+        self.text: list[str] = []
+        self.preserve_whitespace = 0
+        self._reset()
+
+    def _reset(self):
+        self.frames: list[tuple[list[str], list[str]]] = [([], [])]  # (markup, images)
+        self.stack: list[str] = []
+        self.skip = 0  # depth inside a subtree that is left out
+        self.void: tuple[str, dict] | None = None  # void start tag awaiting a child
+        self.drop_text = False
+
+    # lxml parser target interface
+
+    def start(self, tag: str, attrib: dict):
+        self._flush_text()
+        attrs = dict(attrib)
+        if self.capturing != "content" and self.result is None:
+            if tag == "div" and attrs.get("id") == "sbo-rt-content":
+                self.capturing = "content"
+                self._reset()
+            elif tag == "body" and self.capturing is None:
+                self.capturing = "body"
+                self._reset()
+        if self.capturing:
+            self._start(tag, attrs)
+        if tag in _PRESERVE_WHITESPACE_TAGS:
+            self.preserve_whitespace += 1
+
+    def end(self, tag: str):
+        self._flush_text()
+        if self.capturing:
+            self._end()
+        if tag in _PRESERVE_WHITESPACE_TAGS:
+            self.preserve_whitespace -= 1
+
+    def data(self, data: str):
+        self.text.append(data)
+
+    def comment(self, text: str):
+        self._flush_text()
+        self._markup(f"<!--{self._collapse(text)}-->")
+
+    def pi(self, target: str, data: str):
+        self._flush_text()
+        self._markup(f"<?{self._collapse(target + ' ' + data)}>")
+
+    def close(self) -> tuple[str, list[str]] | None:
+        self._flush_text()
+        if self.result is None and self.capturing:
+            self._finish()
+        return self.result
+
+    # Writing
+
+    def _collapse(self, text: str) -> str:
+        """Whitespace-only strings shrink to one space or newline, outside <pre>."""
+        if not self.preserve_whitespace and all(c in _ASCII_SPACES for c in text):
+            return "\n" if "\n" in text else " "
+        return text
+
+    def _flush_text(self):
+        if not self.text:
+            return
+        text = self._collapse("".join(self.text))
+        self.text = []
+        if not self.capturing or self.skip or self.drop_text:
+            return
+        self._open_void()
+        raw = self.stack[-1] in _RAW_TEXT_TAGS
+        self._write(text if raw else text.translate(_ESCAPES))
+
+    def _markup(self, markup: str):
+        if self.capturing and not self.skip:
+            self._open_void()
+            self._write(markup)
+
+    def _write(self, markup: str):
+        self.frames[-1][0].append(markup)
+
+    def _open_void(self):
+        """A void-named element turned out to have content; write it as a normal tag."""
+        if self.void is not None:
+            tag, attrs = self.void
+            self.void = None
+            self._write(_start_tag(tag, attrs))
+
+    def _start(self, tag: str, attrs: dict):
+        if self.skip:
+            self.skip += 1
+            return
+        self._open_void()
+
+        if tag == "img":
+            self._image(attrs)
+            self.skip = 1
+            return
+        if tag == "image" and (href := _svg_image_href(attrs)):
+            if self.stack and self.stack[-1] == "svg":
+                # Drop everything buffered for the enclosing <svg>.
+                self.frames.pop()
+                self.stack.pop()
+                self.skip = 1
+            self._image({"src": href})
+            self.skip += 1
+            return
+
+        if tag == "a" and "href" in attrs:
+            attrs["href"] = _rewrite_href(attrs["href"], self.book_id)
+        elif tag == "meta":
+            _substitute_charset(attrs)
+        elif tag == "svg":
+            self.frames.append(([], []))
+
+        self.stack.append(tag)
+        if tag == "style" and "data-template" in attrs:
+            template = attrs.pop("data-template")
+            self._write(_start_tag(tag, attrs) + template)
+            self.drop_text = True
+        elif tag in _VOID_TAGS:
+            self.void = (tag, attrs)
+        else:
+            self._write(_start_tag(tag, attrs))
+
+    def _end(self):
+        if self.skip:
+            self.skip -= 1
+            return
+        tag = self.stack.pop()
+        if self.void is not None:
+            self._write(_start_tag(*self.void, void=True))
+            self.void = None
+        else:
+            self._write(f"</{tag}>")
+        if tag == "svg":
+            markup, images = self.frames.pop()
+            self.frames[-1][0].extend(markup)
+            self.frames[-1][1].extend(images)
+        self.drop_text = False
+        if not self.stack:
+            self._finish()
+
+    def _image(self, attrs: dict):
+        if self.skip_images:
+            return
+        src = attrs.get("src", "")
+        if src:
+            attrs["src"] = f"Images/{src.split('/')[-1]}"
+            self.frames[-1][1].append(src)
+        self._write(_start_tag("img", attrs, void=True))
+
+    def _finish(self):
+        markup, images = self.frames[0]
+        self.result = "".join(markup), images
+        self.capturing = None
+
+
+def _substitute_charset(attrs: dict):
+    """Declared encodings in <meta> print as utf-8, as BeautifulSoup's str() does."""
+    if "charset" in attrs:
+        attrs["charset"] = "utf-8"
+    elif "content" in attrs and attrs.get("http-equiv", "").lower() == "content-type":
+        attrs["content"] = _CHARSET_RE.sub(lambda m: m.group(1) + "utf-8", attrs["content"])
+
+
+def _start_tag(tag: str, attrs: dict, void: bool = False) -> str:
+    """Opening tag as BeautifulSoup prints it: sorted, escaped, list attributes normalized."""
+    list_attributes = _LIST_ATTRIBUTES["*"] | _LIST_ATTRIBUTES.get(tag, frozenset())
+    parts = [tag]
+    for key, value in sorted(attrs.items()):
+        if key in list_attributes:
+            value = " ".join(value.split())
+        value = value.translate(_ESCAPES)
+        if '"' not in value:
+            parts.append(f'{key}="{value}"')
+        elif "'" not in value:
+            parts.append(f"{key}='{value}'")
+        else:
+            parts.append(f'{key}="{value.replace(chr(34), "&quot;")}"')
+    return f"<{' '.join(parts)}{'/' if void else ''}>"
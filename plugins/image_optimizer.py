@@ -0,0 +1,173 @@
+"""Optional image optimization before EPUB/PDF generation, using Pillow."""
+
+import hashlib
+import io
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable
+
+import config
+from core.asset_store import place
+from core.http_cache import write_atomic
+from utils import rewrite_css_urls
+
+from .base import Plugin
+
+JPEG_SUFFIXES = (".jpg", ".jpeg")
+OPTIMIZABLE_SUFFIXES = (".png", *JPEG_SUFFIXES)
+
+
+class ImageOptimizerPlugin(Plugin):
+    """Downsamples and recompresses downloaded images.
+
+    Images wider than the page at the target DPI are scaled down and PNGs
+    are re-encoded losslessly with maximum compression. JPEGs that need no
+    scaling keep their original bytes. Only with ``IMAGE_PNG_TO_JPEG`` do
+    opaque photographic PNGs (too many colors for a palette) become JPEGs,
+    when that is smaller. Results are cached under CACHE_DIR by source
+    hash and settings, so each image is only processed once.
+    """
+
+    def __init__(self):
+        self._pil = None
+
+    @property
+    def pil(self):
+        """Lazy import Pillow so the rest of the pipeline works without it."""
+        if self._pil is None:
+            try:
+                from PIL import Image
+                self._pil = Image
+            except ImportError as e:
+                raise ImportError(
+                    "Pillow is required for image optimization. "
+                    "Install with: pip install Pillow"
+                ) from e
+        return self._pil
+
+    def settings(self) -> dict:
+        return {
+            "max_width": int(config.IMAGE_TARGET_DPI * config.IMAGE_PAGE_WIDTH_INCHES),
+            "jpeg_quality": config.IMAGE_JPEG_QUALITY,
+            "png_to_jpeg": config.IMAGE_PNG_TO_JPEG,
+        }
+
+    def optimize_dir(self, images_dir: Path, max_workers: int | None = None) -> dict[str, str]:
+        """Optimize every image in ``images_dir``; returns renamed files (old name -> new name)."""
+        if not images_dir.exists():
+            return {}
+        self.pil  # Fail before starting any work when Pillow is missing
+        files = [
+            p for p in sorted(images_dir.iterdir())
+            if p.suffix.lower() in OPTIMIZABLE_SUFFIXES and not p.name.startswith(".")
+        ]
+        with ThreadPoolExecutor(max_workers=max_workers or os.cpu_count()) as pool:
+            names = list(pool.map(self.optimize_file, files))
+        return {p.name: name for p, name in zip(files, names) if name != p.name}
+
+    def optimize_file(self, path: Path) -> str:
+        """Replace ``path`` with its optimized version and return the resulting file name.
+
+        The file is replaced, never rewritten in place, since it may be a
+        hardlink into the asset store.
+        """
+        source = path.read_bytes()
+        settings = self.settings()
+        key = hashlib.sha256(source + json.dumps(settings, sort_keys=True).encode()).hexdigest()
+        cache_dir = config.CACHE_DIR / "images" / key[:2]
+
+        cached = next((p for p in cache_dir.glob(f"{key}.*")), None) if cache_dir.exists() else None
+        if cached is None:
+            data, suffix = self._optimize(source, path.suffix.lower(), settings)
+            cached = cache_dir / f"{key}{suffix}"
+            write_atomic(cached, data)
+
+        suffix = cached.suffix
+        same_format = suffix == path.suffix.lower() or (
+            suffix in JPEG_SUFFIXES and path.suffix.lower() in JPEG_SUFFIXES
+        )
+        target = path if same_format else path.with_suffix(suffix)
+        if target != path and target.exists():
+            return path.name  # Another image already has that name; keep the original
+        place(cached, target)
+        if target != path:
+            path.unlink()
+        return target.name
+
+    def _optimize(self, source: bytes, suffix: str, settings: dict) -> tuple[bytes, str]:
+        Image = self.pil
+        with Image.open(io.BytesIO(source)) as img:
+            resized = img.width > settings["max_width"]
+            if getattr(img, "is_animated", False) or (suffix in JPEG_SUFFIXES and not resized):
+                return source, suffix  # Re-encoding a JPEG at its own size only loses detail
+            img.load()
+            if img.mode == "CMYK":
+                img = img.convert("RGB")
+
+            if resized:
+                height = max(1, round(img.height * settings["max_width"] / img.width))
+                img = img.resize((settings["max_width"], height), Image.LANCZOS)
+
+            candidates = [] if resized else [(source, suffix)]
+            if suffix in JPEG_SUFFIXES:
+                candidates.append((self._encode_jpeg(img, settings), ".jpg"))
+            else:
+                candidates.append((self._encode(img, "PNG", optimize=True), ".png"))
+                if settings["png_to_jpeg"] and self._photographic(img):
+                    candidates.append((self._encode_jpeg(img, settings), ".jpg"))
+        return min(candidates, key=lambda c: len(c[0]))
+
+    def _photographic(self, img) -> bool:
+        """Opaque, with too many colors for a palette: what JPEG compresses well."""
+        opaque = img.mode in ("RGB", "L") or (
+            img.mode in ("RGBA", "LA") and img.getchannel("A").getextrema()[0] == 255
+        )
+        return opaque and img.getcolors(maxcolors=256) is None
+
+    def _encode_jpeg(self, img, settings: dict) -> bytes:
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        return self._encode(img, "JPEG", quality=settings["jpeg_quality"], optimize=True, progressive=True)
+
+    def _encode(self, img, fmt: str, **options) -> bytes:
+        buffer = io.BytesIO()
+        img.save(buffer, fmt, **options)
+        return buffer.getvalue()
+
+    def thumbnail(self, source: bytes, width: int) -> bytes:
+        """A JPEG of ``source`` scaled down to at most ``width`` pixels wide."""
+        Image = self.pil
+        with Image.open(io.BytesIO(source)) as img:
+            img.load()
+            if img.mode in ("RGBA", "LA", "P"):
+                img = img.convert("RGBA")
+                background = Image.new("RGB", img.size, (255, 255, 255))
+                background.paste(img, mask=img.getchannel("A"))
+                img = background
+            if img.width > width:
+                height = max(1, round(img.height * width / img.width))
+                img = img.resize((width, height), Image.LANCZOS)
+            return self._encode_jpeg(img, self.settings())
+
+    def rewrite_references(self, content: str, renames: dict[str, str]) -> str:
+        """Point ``Images/<old>`` and ``url(...)`` references in chapter HTML at the renamed files."""
+        if not renames:
+            return content
+
+        def replace(match: re.Match) -> str:
+            return match.group(1) + renames.get(match.group(2), match.group(2))
+
+        return rewrite_css_urls(re.sub(r"(Images/)([^\"'\s)]+)", replace, content), renames)
+
+    def rewrite_stylesheets(self, css_paths: Iterable[Path], renames: dict[str, str]):
+        """Point ``url(...)`` references in saved stylesheets at the renamed files."""
+        if not renames:
+            return
+        for css_path in set(css_paths):
+            css = css_path.read_text()
+            rewritten = rewrite_css_urls(css, renames)
+            if rewritten != css:
+                css_path.write_text(rewritten)
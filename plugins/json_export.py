@@ -3,7 +3,7 @@
 import json
 from pathlib import Path
 
-from core.text_extractor import TextExtractor
+from core.chapter_document import ChapterDocument
 from utils.files import sanitize_filename
 
 from .base import Plugin
@@ -12,14 +12,11 @@ from .base import Plugin
 class JsonExportPlugin(Plugin):
     """Generate structured JSON output for AI/LLM workflows."""
 
-    def __init__(self):
-        self._extractor = TextExtractor()
-
     def generate(
         self,
         book_dir: Path,
         book_metadata: dict,
-        chapters_data: list[tuple[str, str, str]],
+        chapters_data: list[ChapterDocument],
         include_jsonl: bool = False,
     ) -> Path:
         """Generate JSON export (.json and optional .jsonl)."""
@@ -40,12 +37,12 @@ class JsonExportPlugin(Plugin):
     def _build_export_structure(
         self,
         book_metadata: dict,
-        chapters_data: list[tuple[str, str, str]],
+        chapters_data: list[ChapterDocument],
     ) -> dict:
         """Build the complete export data structure."""
         chapters = []
-        for i, (filename, title, html) in enumerate(chapters_data):
-            chapter_data = self._process_chapter(i, filename, title, html)
+        for i, chapter in enumerate(chapters_data):
+            chapter_data = self._process_chapter(i, chapter)
             chapters.append(chapter_data)
 
         return {
@@ -64,28 +61,20 @@ class JsonExportPlugin(Plugin):
             "statistics": self._calculate_statistics(chapters),
         }
 
-    def _process_chapter(
-        self,
-        index: int,
-        filename: str,
-        title: str,
-        html_content: str,
-    ) -> dict:
+    def _process_chapter(self, index: int, chapter: ChapterDocument) -> dict:
         """Process a single chapter into export structure."""
-        extracted = self._extractor.extract(html_content)
-
         code_blocks = [
-            {"language": cb.language, "code": cb.code} for cb in extracted.code_blocks
+            {"language": cb.language, "code": cb.code} for cb in chapter.code_blocks
         ]
 
-        word_count = self._count_words(extracted.text)
-        token_count = self._get_token_count(extracted.text)
+        word_count = self._count_words(chapter.text)
+        token_count = self._get_token_count(chapter.text)
 
         return {
             "index": index,
-            "title": title,
-            "filename": filename,
-            "content": extracted.text,
+            "title": chapter.title,
+            "filename": chapter.filename,
+            "content": chapter.text,
             "code_blocks": code_blocks,
             "word_count": word_count,
             "token_count": token_count,
@@ -1,6 +1,8 @@
 import re
 from pathlib import Path
 from markdownify import markdownify as md
+
+from core.chapter_document import ChapterDocument
 from .base import Plugin
 
 
@@ -29,7 +31,7 @@ class MarkdownPlugin(Plugin):
     def generate_book(
         self,
         book_info: dict,
-        chapters: list[tuple[str, str, str]],
+        chapters: list[ChapterDocument],
         output_dir: Path,
     ):
         md_dir = output_dir / "Markdown"
@@ -40,10 +42,10 @@ class MarkdownPlugin(Plugin):
         readme += f"**Publishers:** {', '.join(book_info.get('publishers', []))}\n\n"
         readme += "## Chapters\n\n"
 
-        for filename, title, html in chapters:
-            md_filename = filename.replace(".html", ".md").replace(".xhtml", ".md")
-            self.save_chapter(html, title, md_dir / md_filename)
-            readme += f"- [{title}]({md_filename})\n"
+        for chapter in chapters:
+            md_filename = chapter.filename.replace(".html", ".md").replace(".xhtml", ".md")
+            self.save_chapter(chapter.html, chapter.title, md_dir / md_filename)
+            readme += f"- [{chapter.title}]({md_filename})\n"
 
         (md_dir / "README.md").write_text(readme)
 
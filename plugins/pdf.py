@@ -4,6 +4,7 @@ import html
 import re
 from pathlib import Path
 
+from core.chapter_document import ChapterDocument
 from utils.files import sanitize_filename
 
 from .base import Plugin
@@ -39,6 +40,7 @@ class PdfPlugin(Plugin):
         output_dir: Path,
         css_files: list[str],
         cover_image: str | None = None,
+        documents: list[ChapterDocument] | None = None,
     ) -> Path:
         """
         Generate a single PDF containing all chapters.
@@ -50,6 +52,8 @@ class PdfPlugin(Plugin):
             output_dir: Path to output/{book_id}/ directory
             css_files: List of CSS filenames in OEBPS/Styles/
             cover_image: Optional cover image filename in OEBPS/Images/
+            documents: Processed chapters; their bodies are used instead of
+                re-reading the XHTML files
 
         Returns:
             Path to generated PDF file
@@ -64,6 +68,7 @@ class PdfPlugin(Plugin):
             oebps=oebps,
             css_files=css_files,
             cover_image=cover_image,
+            documents=documents,
         )
 
         title = book_info.get("title", "book")
@@ -84,6 +89,7 @@ class PdfPlugin(Plugin):
         chapters: list[dict],
         output_dir: Path,
         css_files: list[str],
+        documents: list[ChapterDocument] | None = None,
     ) -> list[Path]:
         """
         Generate individual PDF files for each chapter.
@@ -93,6 +99,7 @@ class PdfPlugin(Plugin):
             chapters: List of chapter dicts with filename, title, order
             output_dir: Path to output/{book_id}/ directory
             css_files: List of CSS filenames in OEBPS/Styles/
+            documents: Processed chapters, as for generate()
 
         Returns:
             List of paths to generated PDF files
@@ -107,14 +114,14 @@ class PdfPlugin(Plugin):
         original_css = self._load_css_files(oebps, css_files)
 
         pdf_paths = []
+        bodies = {doc.filename: doc.html for doc in documents or []}
         sorted_chapters = sorted(chapters, key=lambda c: c.get("order", 0))
 
         for i, chapter in enumerate(sorted_chapters):
-            xhtml_path = oebps / chapter["filename"].replace(".html", ".xhtml")
-            if not xhtml_path.exists():
+            body = self._chapter_body(chapter, oebps, bodies)
+            if body is None:
                 continue
 
-            body = self._extract_chapter_body(xhtml_path)
             chapter_title = self._escape_html(chapter.get("title", f"Chapter {i+1}"))
 
             chapter_html = f'''<!DOCTYPE html>
@@ -155,6 +162,7 @@ class PdfPlugin(Plugin):
         oebps: Path,
         css_files: list[str],
         cover_image: str | None,
+        documents: list[ChapterDocument] | None = None,
     ) -> str:
         """Build single HTML document combining all chapters."""
         print_css = self._get_print_css()
@@ -164,14 +172,14 @@ class PdfPlugin(Plugin):
         toc_html = self._generate_toc_html(toc, chapters)
 
         chapters_html_parts = []
+        bodies = {doc.filename: doc.html for doc in documents or []}
         sorted_chapters = sorted(chapters, key=lambda c: c.get("order", 0))
 
         for chapter in sorted_chapters:
-            xhtml_path = oebps / chapter["filename"].replace(".html", ".xhtml")
-            if not xhtml_path.exists():
+            body = self._chapter_body(chapter, oebps, bodies)
+            if body is None:
                 continue
 
-            body = self._extract_chapter_body(xhtml_path)
             chapter_id = Path(chapter["filename"]).stem
             chapter_title = self._escape_html(chapter.get("title", ""))
 
@@ -263,6 +271,15 @@ class PdfPlugin(Plugin):
         <ul>{toc_items}</ul>
     </section>'''
 
+    def _chapter_body(self, chapter: dict, oebps: Path, bodies: dict[str, str]) -> str | None:
+        """Body markup from the chapter's document if given, else from its XHTML file."""
+        if chapter["filename"] in bodies:
+            return bodies[chapter["filename"]]
+        xhtml_path = oebps / chapter["filename"].replace(".html", ".xhtml")
+        if not xhtml_path.exists():
+            return None
+        return self._extract_chapter_body(xhtml_path)
+
     def _extract_chapter_body(self, xhtml_path: Path) -> str:
         """Extract body content from XHTML file."""
         content = xhtml_path.read_text(encoding="utf-8")
@@ -2,7 +2,7 @@
 
 from pathlib import Path
 
-from core.text_extractor import TextExtractor
+from core.chapter_document import ChapterDocument
 from utils.files import sanitize_filename
 
 from .base import Plugin
@@ -11,14 +11,11 @@ from .base import Plugin
 class PlainTextPlugin(Plugin):
     """Generate plain text output from processed chapters."""
 
-    def __init__(self):
-        self._extractor = TextExtractor()
-
     def generate(
         self,
         book_dir: Path,
         book_metadata: dict,
-        chapters_data: list[tuple[str, str, str]],
+        chapters_data: list[ChapterDocument],
         single_file: bool = True,
     ) -> Path:
         """Generate plain text export (single file or per-chapter)."""
@@ -31,7 +28,7 @@ class PlainTextPlugin(Plugin):
         self,
         book_dir: Path,
         book_metadata: dict,
-        chapters_data: list[tuple[str, str, str]],
+        chapters_data: list[ChapterDocument],
     ) -> Path:
         """Generate single concatenated text file."""
         title = book_metadata.get("title", "Unknown")
@@ -40,9 +37,8 @@ class PlainTextPlugin(Plugin):
 
         content_parts = [self._format_metadata_header(book_metadata)]
 
-        for i, (filename, chapter_title, html) in enumerate(chapters_data, 1):
-            text = self._extractor.extract_text_only(html)
-            content_parts.append(self._format_chapter(i, chapter_title, text))
+        for i, chapter in enumerate(chapters_data, 1):
+            content_parts.append(self._format_chapter(i, chapter.title, chapter.text))
 
         output_path.write_text("\n\n".join(content_parts), encoding="utf-8")
         return output_path
@@ -51,7 +47,7 @@ class PlainTextPlugin(Plugin):
         self,
         book_dir: Path,
         book_metadata: dict,
-        chapters_data: list[tuple[str, str, str]],
+        chapters_data: list[ChapterDocument],
     ) -> Path:
         """Generate individual chapter files in PlainText/ subdirectory."""
         txt_dir = book_dir / "PlainText"
@@ -60,14 +56,13 @@ class PlainTextPlugin(Plugin):
         readme_parts = [self._format_metadata_header(book_metadata)]
         readme_parts.append("## Chapters\n")
 
-        for i, (filename, chapter_title, html) in enumerate(chapters_data, 1):
-            text = self._extractor.extract_text_only(html)
-            content = self._format_chapter(i, chapter_title, text)
+        for i, chapter in enumerate(chapters_data, 1):
+            content = self._format_chapter(i, chapter.title, chapter.text)
 
-            txt_filename = self._make_chapter_filename(filename, i)
+            txt_filename = self._make_chapter_filename(chapter.filename, i)
             (txt_dir / txt_filename).write_text(content, encoding="utf-8")
 
-            readme_parts.append(f"- [{chapter_title}]({txt_filename})")
+            readme_parts.append(f"- [{chapter.title}]({txt_filename})")
 
         (txt_dir / "README.txt").write_text("\n".join(readme_parts), encoding="utf-8")
         return txt_dir
@@ -0,0 +1,160 @@
+"""Download planning from the book's file manifest."""
+
+import logging
+import time
+from dataclasses import dataclass, field
+
+import config
+from core.ttl_cache import TTLCache
+from core.types import ChapterInfo, PlannedFile
+from .base import Plugin
+
+logger = logging.getLogger(__name__)
+
+CHAPTER = "chapter"
+STYLESHEET = "stylesheet"
+IMAGE = "image"
+
+
+def _manifest_key(url: str) -> str:
+    """Match files by their path inside the EPUB, whatever host or prefix the URL has."""
+    return url.split("/files/", 1)[-1]
+
+
+@dataclass
+class FetchPlan:
+    """Every file a download needs, deduplicated by URL, in order of first use.
+
+    Sizes come from the book's file manifest where it lists them; files
+    of unknown size are weighted as the average known size so progress
+    and ETA stay proportional to bytes.
+    """
+
+    files: dict[str, PlannedFile] = field(default_factory=dict)
+    _average: int | None = field(default=None, init=False, repr=False, compare=False)
+
+    def add(self, url: str, kind: str, size: int | None = None):
+        if url and url not in self.files:
+            self.files[url] = PlannedFile(url=url, kind=kind, size=size)
+            self._average = None
+
+    def urls(self, kind: str) -> list[str]:
+        return [url for url, f in self.files.items() if f["kind"] == kind]
+
+    def size(self, url: str) -> int | None:
+        entry = self.files.get(url)
+        return entry["size"] if entry else None
+
+    def weight(self, url: str) -> int:
+        size = self.size(url)
+        if size is not None:
+            return size
+        if self._average is None:
+            known = [f["size"] for f in self.files.values() if f["size"] is not None]
+            self._average = sum(known) // len(known) if known else 1
+        return self._average
+
+    def total_weight(self, urls: list[str] | None = None) -> int:
+        return sum(self.weight(url) for url in (self.files if urls is None else urls))
+
+    def largest_first(self, urls: list[str]) -> list[str]:
+        """Order ``urls`` so the biggest transfers start first and don't trail at the end."""
+        return sorted(urls, key=self.weight, reverse=True)
+
+
+class PlanProgress:
+    """Fraction done and ETA of a plan, measured in (estimated) bytes."""
+
+    def __init__(self, plan: FetchPlan, urls: list[str] | None = None):
+        self.plan = plan
+        self.total = max(1, plan.total_weight(urls))
+        self.done = 0
+        self.started = time.monotonic()
+
+    def advance(self, url: str):
+        self.done += self.plan.weight(url)
+
+    def discard(self, urls: list[str]):
+        """Drop files that turned out not to be needed from the total."""
+        self.total = max(1, self.total - self.plan.total_weight(urls))
+
+    @property
+    def fraction(self) -> float:
+        return min(1.0, self.done / self.total)
+
+    def eta_seconds(self) -> int | None:
+        if not self.done:
+            return None
+        elapsed = time.monotonic() - self.started
+        return int(elapsed / self.done * max(0, self.total - self.done))
+
+
+class FetchPlannerPlugin(Plugin):
+    """Builds the download plan for a book from its file manifest."""
+
+    def __init__(self):
+        self._manifests = TTLCache(
+            ttl=config.METADATA_CACHE_TTL,
+            directory=config.CACHE_DIR / "manifests",
+        )
+
+    def plan(
+        self,
+        book_info: dict,
+        chapters: list[ChapterInfo],
+        include_images: bool = True,
+        fetch_manifest: bool = True,
+    ) -> FetchPlan:
+        """Plan the chapters' content, stylesheets and (optionally) images.
+
+        The manifest at ``files_url`` is only read for sizes, and is
+        cached per book like its metadata; what is fetched is still
+        decided by the chapters. With ``fetch_manifest`` False (a few
+        selected chapters, where paging through the whole manifest would
+        cost more than it saves) only a cached manifest is used, and
+        otherwise every file weighs the same.
+        """
+        sizes = self._manifest_sizes(book_info.get("files_url"), fetch_manifest)
+
+        def size_of(url: str) -> int | None:
+            return sizes.get(_manifest_key(url))
+
+        plan = FetchPlan()
+        for ch in chapters:
+            plan.add(ch["content_url"], CHAPTER, size_of(ch["content_url"]))
+        for ch in chapters:
+            for url in ch["stylesheets"]:
+                plan.add(url, STYLESHEET, size_of(url))
+        if include_images:
+            for ch in chapters:
+                for url in ch["images"]:
+                    plan.add(url, IMAGE, size_of(url))
+        return plan
+
+    def _manifest_sizes(self, files_url: str | None, fetch: bool) -> dict[str, int]:
+        if not files_url:
+            return {}
+        # Under a cassette every request must reach it.
+        caching = self.http.cassette is None
+        if caching:
+            sizes = self._manifests.get(files_url)
+            if sizes is not None:
+                return sizes
+        if not fetch:
+            return {}
+        try:
+            pages = self.http.get_pages(files_url)
+        except Exception as e:
+            logger.warning("Could not read file manifest %s: %s", files_url, e)
+            return {}
+
+        sizes = {}
+        for page in pages:
+            for item in page.get("results", []):
+                url = item.get("url") or item.get("full_path")
+                size = item.get("file_size", item.get("size"))
+                if url and isinstance(size, int):
+                    sizes[_manifest_key(url)] = size
+        if caching:
+            self._manifests.set(files_url, sizes)
+        return sizes
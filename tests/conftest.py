@@ -0,0 +1,59 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import config  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def isolated_config(tmp_path, monkeypatch):
+    """Keep caches, cookies and stores out of the working tree."""
+    data = tmp_path / "data"
+    monkeypatch.setattr(config, "DATA_DIR", data)
+    monkeypatch.setattr(config, "CACHE_DIR", data / "cache")
+    monkeypatch.setattr(config, "CASSETTE_DIR", data / "cassettes")
+    monkeypatch.setattr(config, "RATE_LIMIT_DB", data / "rate_limit.db")
+    monkeypatch.setattr(config, "ASSET_STORE_DIR", data / "assets")
+    monkeypatch.setattr(config, "COOKIES_FILE", tmp_path / "cookies.json")
+    monkeypatch.setattr(config, "OUTPUT_DIR", tmp_path / "output")
+    monkeypatch.setattr(config, "SHARED_RATE_LIMIT", False)
+    monkeypatch.setattr(config, "HEDGE_ENABLED", False)
+    monkeypatch.setattr(config, "REQUEST_DELAY", 0.001)
+    monkeypatch.setattr(config, "RATE_LIMIT_BURST", 100)
+    return tmp_path
+
+
+@pytest.fixture
+def upstream(monkeypatch):
+    """A local stand-in for the O'Reilly API serving one small book."""
+    from tests import fakeapi
+
+    server = fakeapi.start()
+    monkeypatch.setattr(config, "BASE_URL", server.base_url)
+    monkeypatch.setattr(config, "API_V1", server.base_url + "/api/v1")
+    monkeypatch.setattr(config, "API_V2", server.base_url + "/api/v2")
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+@pytest.fixture
+def web():
+    """The web UI's server on a free port, with a fresh kernel."""
+    import threading
+
+    from web.server import DownloaderHandler, create_server
+
+    server = create_server("127.0.0.1", 0)
+    server.base_url = f"http://127.0.0.1:{server.server_port}"
+    server.kernel = DownloaderHandler.kernel
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,157 @@
+"""Minimal fake of the upstream API: one book with a few chapters, images and a stylesheet."""
+
+import json
+import struct
+import threading
+import zlib
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+BOOK = "9781000000001"
+CHAPTERS = 3
+LAST_MODIFIED = "Mon, 05 Oct 2026 00:00:00 GMT"
+STYLESHEET = "p { margin: 0 }\n.note { background: url('assets/bg.png') }\n"
+
+
+def _png(size: int = 8) -> bytes:
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    rows = b"".join(
+        b"\x00" + b"".join(bytes([x * 16 % 256, y * 16 % 256, 128]) for x in range(size)) for y in range(size)
+    )
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(rows)) + chunk(b"IEND", b"")
+
+
+PNG = _png()
+
+
+def chapter_html(i: int) -> str:
+    return (
+        '<html><head><title>x</title></head><body><div id="sbo-rt-content">'
+        f'<h1>Chapter {i}</h1><p>Text for chapter {i}.</p>'
+        f'<figure><img src="assets/img{i}.png" alt="figure {i}"/></figure>'
+        "</div></body></html>"
+    )
+
+
+class FakeServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.base_url = f"http://127.0.0.1:{self.server_port}"
+        self.hits: Counter = Counter()
+        self.requests: list[tuple[str, dict]] = []
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeServer
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, body, content_type: str = "application/json", status: int = 200, headers: dict | None = None):
+        if isinstance(body, (dict, list)):
+            body = json.dumps(body)
+        if isinstance(body, str):
+            body = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_validated(self, body: str, content_type: str):
+        """Send ``body`` with validators, or a 304 if the client's copy is current."""
+        etag = f'"{zlib.crc32(body.encode()):08x}"'
+        validators = {"ETag": etag, "Last-Modified": LAST_MODIFIED}
+        if self.headers.get("If-None-Match") == etag or self.headers.get("If-Modified-Since") == LAST_MODIFIED:
+            return self._send(b"", content_type, status=304, headers=validators)
+        return self._send(body, content_type, headers=validators)
+
+    def do_GET(self):
+        self.server.hits[self.path] += 1
+        self.server.requests.append((self.path, dict(self.headers)))
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        path = url.path
+        base = self.server.base_url
+        epub = f"{base}/api/v2/epubs/urn:orm:book:{BOOK}"
+
+        if path == "/api/v2/search/":
+            return self._send({"results": [{
+                "archive_id": BOOK,
+                "title": "Fake Book",
+                "authors": ["Author"],
+                "publishers": ["Publisher"],
+                "cover_url": f"{base}/library/cover/{BOOK}/",
+                "content_format": "book",
+            }]})
+        if path == f"/api/v2/epubs/urn:orm:book:{BOOK}/":
+            return self._send({
+                "ourn": f"urn:orm:book:{BOOK}",
+                "title": "Fake Book",
+                "isbn": BOOK,
+                "descriptions": {"text/html": "<p>About.</p>"},
+                "chapters": f"{base}/api/v2/epub-chapters/?epub_identifier=urn:orm:book:{BOOK}",
+                "table_of_contents": f"{epub}/table-of-contents/",
+                "spine": f"{epub}/spine/",
+                "files": f"{epub}/files/",
+            })
+        if path == "/api/v2/epub-chapters/":
+            return self._send({"count": CHAPTERS, "next": None, "results": [{
+                "ourn": f"urn:orm:book:{BOOK}:ch{i}",
+                "title": f"Chapter {i}",
+                "reference_id": f"{BOOK}-/ch{i}.html",
+                "content_url": f"{epub}/files/ch{i}.html",
+                "related_assets": {
+                    "images": [f"{epub}/files/assets/{name}.png" for name in (f"img{i}", "bg", "unused")],
+                    "stylesheets": [f"{epub}/files/style.css"],
+                },
+                "virtual_pages": 1,
+                "minutes_required": 1.0,
+            } for i in range(CHAPTERS)]})
+        if path == f"/api/v2/epubs/urn:orm:book:{BOOK}/table-of-contents/":
+            return self._send([{
+                "title": f"Chapter {i}",
+                "reference_id": f"{BOOK}-/ch{i}.html",
+                "ourn": f"urn:orm:book:{BOOK}:ch{i}",
+                "children": [],
+            } for i in range(CHAPTERS)])
+        if path == f"/api/v2/epubs/urn:orm:book:{BOOK}/files/":
+            page = int(query.get("page", ["1"])[0])
+            if page > 1:
+                return self._send({"count": 0, "next": None, "results": []})
+            return self._send({"count": CHAPTERS, "next": None, "results": [{
+                "url": f"{epub}/files/ch{i}.html",
+                "full_path": f"ch{i}.html",
+                "media_type": "application/xhtml+xml",
+                "kind": "chapter",
+                "file_size": len(chapter_html(i)),
+            } for i in range(CHAPTERS)]})
+        if path.startswith(f"/api/v2/epubs/urn:orm:book:{BOOK}/files/"):
+            name = path.rsplit("/files/", 1)[1]
+            if name.endswith(".css"):
+                return self._send(STYLESHEET, "text/css")
+            if name.endswith(".png"):
+                return self._send(PNG, "image/png")
+            return self._send_validated(chapter_html(int(name[2:-5])), "text/html")
+        if path.startswith("/library/cover/"):
+            return self._send(PNG, "image/png")
+        self._send({"detail": "Not found."}, status=404)
+
+
+def start() -> FakeServer:
+    server = FakeServer()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
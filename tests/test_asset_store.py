@@ -0,0 +1,54 @@
+import threading
+
+from core.asset_store import AssetStore, place
+
+
+def test_concurrent_place_to_same_dest(tmp_path):
+    sources = []
+    for i in range(8):
+        source = tmp_path / f"src{i}.png"
+        source.write_bytes(b"same bytes")
+        sources.append(source)
+    dest = tmp_path / "book" / "Images" / "a.png"
+
+    errors = []
+
+    def run(source):
+        try:
+            for _ in range(50):
+                place(source, dest)
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(s,)) for s in sources]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert dest.read_bytes() == b"same bytes"
+    assert [p.name for p in dest.parent.iterdir()] == ["a.png"]
+
+
+def test_concurrent_add_of_identical_downloads(tmp_path):
+    store = AssetStore(tmp_path / "store")
+    paths = []
+    for i in range(8):
+        path = tmp_path / f"book{i}" / "a.png"
+        path.parent.mkdir()
+        path.write_bytes(b"image")
+        paths.append(path)
+
+    threads = [
+        threading.Thread(target=store.add, args=(f"https://example.com/{i}/a.png", path))
+        for i, path in enumerate(paths)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    blobs = [p for p in (tmp_path / "store" / "blobs").rglob("*") if p.is_file()]
+    assert len(blobs) == 1
+    assert all(store.read(f"https://example.com/{i}/a.png") == b"image" for i in range(8))
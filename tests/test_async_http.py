@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import time
+
+from core import create_default_kernel
+from core.cassette import RECORD, REPLAY
+from core.rate_limiter import BULK, METADATA
+from tests import fakeapi
+
+
+def test_outstanding_fetches_share_the_client_threads():
+    kernel = create_default_kernel()
+    threads = set()
+
+    def fetch(i):
+        threads.add(threading.current_thread().name)
+        time.sleep(0.005)
+        return i
+
+    async def main():
+        return [result async for _, result in kernel.async_http.completed(fetch, range(200))]
+
+    results = asyncio.run(main())
+
+    assert sorted(results) == list(range(200))
+    assert len(threads) <= kernel.http.max_concurrency
+    assert all(name.startswith("http-async") for name in threads)
+
+
+def test_calls_carry_the_awaiting_threads_context(upstream, tmp_path):
+    kernel = create_default_kernel()
+    url = f"{upstream.base_url}/api/v2/search/?query=async&limit=1"
+    seen = []
+
+    async def main():
+        seen.append(await kernel.async_http.run(lambda: kernel.http._priority_for("default")))
+        return await kernel.async_http.get_json(url)
+
+    with kernel.http.priority(METADATA), kernel.http.use_cassette(tmp_path / "c.jsonl.gz", RECORD):
+        recorded = asyncio.run(main())
+
+    upstream.stop()
+    with kernel.http.use_cassette(tmp_path / "c.jsonl.gz", REPLAY):
+        replayed = asyncio.run(main())
+
+    assert seen == [METADATA, BULK]
+    assert replayed == recorded
+
+
+def test_sync_fetch_contents_runs_on_the_async_client(upstream):
+    kernel = create_default_kernel()
+    epub = f"{upstream.base_url}/api/v2/epubs/urn:orm:book:{fakeapi.BOOK}/files"
+    urls = [f"{epub}/ch{i}.html" for i in reversed(range(fakeapi.CHAPTERS))]
+    progress = []
+
+    contents = kernel["chapters"].fetch_contents(urls, progress_callback=lambda done, total: progress.append(done))
+
+    assert contents == [fakeapi.chapter_html(i) for i in reversed(range(fakeapi.CHAPTERS))]
+    assert progress == [1, 2, 3]
+    assert all(upstream.hits[url.removeprefix(upstream.base_url)] == 1 for url in urls)
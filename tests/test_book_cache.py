@@ -0,0 +1,45 @@
+import time
+
+import pytest
+
+import config
+from core import create_default_kernel, ttl_cache
+from plugins import BookNotFoundError
+from tests import fakeapi
+
+MISSING = "9780000000000"
+
+
+def test_missing_book_is_cached(upstream):
+    book = create_default_kernel()["book"]
+
+    for _ in range(2):
+        with pytest.raises(BookNotFoundError):
+            book.fetch(MISSING)
+    assert upstream.hits[f"/api/v2/epubs/urn:orm:book:{MISSING}/"] == 1
+    sent = sum(upstream.hits.values())
+
+    # A new process reads the miss from the disk cache.
+    with pytest.raises(BookNotFoundError):
+        create_default_kernel()["book"].fetch(MISSING)
+    assert sum(upstream.hits.values()) == sent
+
+
+def test_found_book_is_cached_across_processes(upstream):
+    info = create_default_kernel()["book"].fetch(fakeapi.BOOK)
+    sent = sum(upstream.hits.values())
+
+    assert create_default_kernel()["book"].fetch(fakeapi.BOOK) == info
+    assert sum(upstream.hits.values()) == sent
+
+
+def test_missing_book_is_asked_again_after_the_negative_ttl(upstream, monkeypatch):
+    book = create_default_kernel()["book"]
+    with pytest.raises(BookNotFoundError):
+        book.fetch(MISSING)
+
+    later = time.time() + config.METADATA_NEGATIVE_TTL + 1
+    monkeypatch.setattr(ttl_cache, "time", type("Clock", (), {"time": staticmethod(lambda: later)}))
+    with pytest.raises(BookNotFoundError):
+        book.fetch(MISSING)
+    assert upstream.hits[f"/api/v2/epubs/urn:orm:book:{MISSING}/"] == 2
@@ -0,0 +1,54 @@
+import shutil
+import threading
+
+import pytest
+
+import config
+from core import create_default_kernel
+from core.cassette import RECORD, REPLAY, CassetteMissError
+from tests import fakeapi
+
+
+def _download(kernel, output_dir):
+    kernel["downloader"].download(fakeapi.BOOK, output_dir, formats=["markdown"])
+    return {
+        path.relative_to(output_dir): path.read_bytes()
+        for path in sorted(output_dir.rglob("*"))
+        if path.is_file()
+    }
+
+
+def test_record_then_replay_offline(upstream, monkeypatch, tmp_path):
+    # Warm every local cache first: recording must still capture all traffic.
+    kernel = create_default_kernel()
+    _download(kernel, tmp_path / "warm")
+
+    monkeypatch.setattr(config, "CASSETTE_MODE", "record")
+    recorded = _download(kernel, tmp_path / "recorded")
+
+    # Replay elsewhere: no upstream and none of the caches it was recorded with.
+    upstream.stop()
+    shutil.rmtree(config.CACHE_DIR)
+    shutil.rmtree(config.ASSET_STORE_DIR)
+    monkeypatch.setattr(config, "CASSETTE_MODE", "replay")
+    replayed = _download(create_default_kernel(), tmp_path / "replayed")
+
+    assert replayed == recorded
+    assert any(path.suffix == ".png" for path in recorded)
+
+
+def test_cassette_is_local_to_the_thread(upstream, tmp_path):
+    kernel = create_default_kernel()
+    elsewhere = f"{upstream.base_url}/api/v2/search/?query=other&limit=1"
+    mine = f"{upstream.base_url}/api/v2/search/?query=mine&limit=1"
+
+    with kernel.http.use_cassette(tmp_path / "c.jsonl.gz", RECORD):
+        other = threading.Thread(target=kernel.http.get_json, args=(elsewhere,))
+        other.start()
+        other.join()
+        kernel.http.get_json(mine)
+
+    with kernel.http.use_cassette(tmp_path / "c.jsonl.gz", REPLAY) as cassette:
+        assert cassette.play(mine).status_code == 200
+        with pytest.raises(CassetteMissError):
+            cassette.play(elsewhere)
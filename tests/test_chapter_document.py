@@ -0,0 +1,43 @@
+import pytest
+
+from core import create_default_kernel
+from core.chapter_document import ChapterDocument
+from core.text_extractor import TextExtractor
+from tests import fakeapi
+
+HTML = "<h1>Title</h1><p>Some text.</p><pre><code>print(1)</code></pre>"
+
+
+@pytest.fixture
+def extractions(monkeypatch):
+    """Every HTML string TextExtractor.extract() is called with."""
+    calls = []
+    extract = TextExtractor.extract
+
+    def spy(self, html, *args, **kwargs):
+        calls.append(html)
+        return extract(self, html, *args, **kwargs)
+
+    monkeypatch.setattr(TextExtractor, "extract", spy)
+    return calls
+
+
+def test_text_is_extracted_on_first_use_only(extractions):
+    doc = ChapterDocument("ch1.html", "Title", HTML)
+    assert extractions == []
+
+    assert "Some text." in doc.text
+    assert [block.code for block in doc.code_blocks] == ["print(1)"]
+    assert doc.text == doc.text
+    assert extractions == [HTML]
+
+
+def test_each_chapter_is_parsed_once_for_all_text_formats(upstream, tmp_path, extractions):
+    kernel = create_default_kernel()
+
+    kernel["downloader"].download(
+        fakeapi.BOOK, tmp_path, formats=["plaintext", "plaintext-chapters", "json", "jsonl", "chunks"]
+    )
+
+    assert len(extractions) == fakeapi.CHAPTERS
+    assert len(set(extractions)) == fakeapi.CHAPTERS
@@ -0,0 +1,53 @@
+import pytest
+import requests
+
+from core.http_client import HttpClient
+from core.retry import CircuitBreaker, RetryPolicy
+
+URL = "https://learning.oreilly.com/api/v2/search/?query=x"
+
+
+def _response(status: int) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.url = URL
+    return response
+
+
+@pytest.fixture
+def client():
+    client = HttpClient()
+    client.retry_policy = RetryPolicy(max_attempts={"default": 1}, base_delay=0)
+    client.breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+    client.breaker.record_failure()
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    return client
+
+
+def test_429_on_trial_closes_breaker(client, monkeypatch):
+    monkeypatch.setattr(client, "_attempt", lambda *args, **kwargs: _response(429))
+
+    assert client._send(URL).status_code == 429
+    assert client.breaker.state == CircuitBreaker.CLOSED
+    client.breaker.before_request()
+
+
+def test_unexpected_exception_on_trial_releases_it(client, monkeypatch):
+    def boom(*args, **kwargs):
+        raise ValueError("boom")
+
+    monkeypatch.setattr(client, "_attempt", boom)
+
+    with pytest.raises(ValueError):
+        client._send(URL)
+    # The next request becomes the trial instead of failing fast forever.
+    client.breaker.before_request()
+
+
+def test_5xx_on_trial_reopens_breaker(client, monkeypatch):
+    client.breaker.reset_timeout = 60
+    client.breaker._opened_at = 0.0
+    monkeypatch.setattr(client, "_attempt", lambda *args, **kwargs: _response(503))
+
+    assert client._send(URL).status_code == 503
+    assert client.breaker.state == CircuitBreaker.OPEN
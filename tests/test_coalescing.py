@@ -0,0 +1,71 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from core.http_client import HttpClient
+from core.rate_limiter import BULK, INTERACTIVE
+
+URL = "https://learning.oreilly.com/api/v2/epubs/urn:orm:book:1/"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    client = HttpClient()
+    client.cache = None
+    release = threading.Event()
+    calls = []
+
+    def send(url, **kwargs):
+        calls.append(url)
+        release.wait(5)
+        response = requests.Response()
+        response.status_code = 200
+        return response
+
+    monkeypatch.setattr(client, "_send", send)
+    client.calls = calls
+    client.release = release
+    return client
+
+
+def _get_in_thread(client, priority):
+    def run():
+        with client.priority(priority):
+            client.get(URL)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    return thread
+
+
+def _wait_for_calls(client, n):
+    for _ in range(500):
+        if len(client.calls) >= n:
+            return
+        time.sleep(0.01)
+
+
+def test_same_priority_is_coalesced(client):
+    threads = [_get_in_thread(client, BULK)]
+    _wait_for_calls(client, 1)
+    threads.append(_get_in_thread(client, BULK))
+    time.sleep(0.1)
+    client.release.set()
+    for thread in threads:
+        thread.join()
+    assert len(client.calls) == 1
+
+
+def test_higher_priority_does_not_wait_on_bulk_leader(client):
+    leader = _get_in_thread(client, BULK)
+    _wait_for_calls(client, 1)
+
+    follower = _get_in_thread(client, INTERACTIVE)
+    _wait_for_calls(client, 2)
+    assert len(client.calls) == 2
+
+    client.release.set()
+    leader.join()
+    follower.join()
@@ -0,0 +1,50 @@
+import io
+
+import pytest
+import requests
+
+import config
+from tests import fakeapi
+
+COVER = f"/library/cover/{fakeapi.BOOK}/"
+
+
+def test_cover_thumbnail_is_served_and_revalidated(upstream, web):
+    Image = pytest.importorskip("PIL.Image")
+    url = f"{web.base_url}/api/cover/{fakeapi.BOOK}?w=96"
+
+    response = requests.get(url, timeout=5)
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "image/jpeg"
+    assert response.headers["Cache-Control"] == f"public, max-age={config.COVER_MAX_AGE}"
+    etag = response.headers["ETag"]
+    with Image.open(io.BytesIO(response.content)) as img:
+        assert img.format == "JPEG"
+        assert img.width <= 96
+
+    again = requests.get(url, headers={"If-None-Match": etag}, timeout=5)
+
+    assert again.status_code == 304
+    assert again.headers["ETag"] == etag
+    assert upstream.hits[COVER] == 1
+
+
+def test_cover_redirects_without_pillow(upstream, web, monkeypatch):
+    def no_pillow(book_id, width):
+        raise ImportError("No module named 'PIL'")
+
+    monkeypatch.setattr(web.kernel["assets"], "cover_thumbnail", no_pillow)
+
+    response = requests.get(f"{web.base_url}/api/cover/{fakeapi.BOOK}", allow_redirects=False, timeout=5)
+
+    assert response.status_code == 302
+    assert response.headers["Location"] == f"{upstream.base_url}{COVER}"
+    assert upstream.hits[COVER] == 0
+
+
+def test_invalid_cover_id_is_not_found(upstream, web):
+    response = requests.get(f"{web.base_url}/api/cover/..%2Fsecret", timeout=5)
+
+    assert response.status_code == 404
+    assert sum(upstream.hits.values()) == 0
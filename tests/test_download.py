@@ -0,0 +1,56 @@
+import pytest
+import requests
+
+from core.http_client import HttpClient
+from core.retry import RetryPolicy
+
+URL = "https://learning.oreilly.com/library/view/book/9781000000001/assets/a.png"
+
+
+class _Body(requests.Response):
+    def __init__(self, chunks):
+        super().__init__()
+        self.status_code = 200
+        self.url = URL
+        self._chunks = chunks
+        self._content_consumed = True
+
+    def iter_content(self, chunk_size=1, decode_unicode=False):
+        for chunk in self._chunks:
+            if isinstance(chunk, Exception):
+                raise chunk
+            yield chunk
+
+
+@pytest.fixture
+def client():
+    client = HttpClient()
+    client.cache = None
+    client.retry_policy = RetryPolicy(max_attempts={"default": 3}, base_delay=0)
+    return client
+
+
+def test_failed_get_is_not_retried_again(client, monkeypatch, tmp_path):
+    calls = []
+
+    def refuse(*args, **kwargs):
+        calls.append(1)
+        raise requests.exceptions.ConnectionError("refused")
+
+    monkeypatch.setattr(client, "_attempt", refuse)
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        client.download_to(URL, tmp_path / "a.png")
+    assert len(calls) == 3
+
+
+def test_interrupted_body_is_retried(client, monkeypatch, tmp_path):
+    bodies = iter([
+        _Body([b"ab", requests.exceptions.ChunkedEncodingError("cut")]),
+        _Body([b"ab", b"cd"]),
+    ])
+    monkeypatch.setattr(client, "_attempt", lambda *args, **kwargs: next(bodies))
+
+    assert client.download_to(URL, tmp_path / "a.png", expected_size=4) == 4
+    assert (tmp_path / "a.png").read_bytes() == b"abcd"
+    assert [p.name for p in tmp_path.iterdir()] == ["a.png"]
@@ -0,0 +1,120 @@
+import threading
+import time
+
+import pytest
+import requests
+
+import config
+from core import create_default_kernel
+from core.http_client import HttpClient
+from core.retry import DeadlineExceeded
+from tests import fakeapi
+
+URL = "https://learning.oreilly.com/api/v2/epubs/urn:orm:book:1/files/ch1.html"
+
+
+class FakeResponse(requests.Response):
+    def __init__(self, name: str, status: int = 200, headers: dict | None = None):
+        super().__init__()
+        self.name = name
+        self.status_code = status
+        self.headers.update(headers or {})
+        self._content = name.encode()
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def hedging(monkeypatch):
+    monkeypatch.setattr(config, "HEDGE_ENABLED", True)
+    monkeypatch.setattr(config, "HEDGE_MIN_SAMPLES", 5)
+    monkeypatch.setattr(config, "HEDGE_MIN_DELAY", 0.05)
+    client = HttpClient()
+    client.cache = None
+    for _ in range(5):
+        client.stats.record("content", 200, 0.01)
+    return client
+
+
+def _sender(client, monkeypatch, delays: list[float]):
+    """Make the n-th request sent take ``delays[n]`` seconds; returns the responses sent."""
+    sent = []
+    lock = threading.Lock()
+
+    def send_once(url, endpoint, priority, on_send=None, **kwargs):
+        with lock:
+            response = FakeResponse(f"response{len(sent)}")
+            delay = delays[len(sent)]
+            sent.append(response)
+        if on_send is not None:
+            on_send()
+        time.sleep(delay)
+        return response
+
+    monkeypatch.setattr(client, "_send_once", send_once)
+    return sent
+
+
+def test_slow_request_is_hedged_and_first_answer_wins(hedging, monkeypatch):
+    sent = _sender(hedging, monkeypatch, [1.0, 0.0])
+
+    response = hedging.get(URL)
+
+    assert response.name == "response1"
+    stats = hedging.stats.snapshot()["content"]
+    assert (stats["hedged"], stats["hedge_wins"]) == (1, 1)
+    # The slower primary is closed once it finally answers.
+    primary = sent[0]
+    deadline = time.monotonic() + 5
+    while not primary.closed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert primary.closed
+    assert not response.closed
+
+
+def test_fast_request_is_not_hedged(hedging, monkeypatch):
+    sent = _sender(hedging, monkeypatch, [0.0, 0.0])
+
+    assert hedging.get(URL).name == "response0"
+    assert len(sent) == 1
+    assert hedging.stats.snapshot()["content"]["hedged"] == 0
+
+
+def test_hedge_waits_for_the_percentile_delay(hedging, monkeypatch):
+    for _ in range(20):
+        hedging.stats.record("content", 200, 0.3)
+    sent = _sender(hedging, monkeypatch, [0.2, 0.0])
+
+    # Slower than the minimum delay but faster than the recent p95.
+    assert hedging.get(URL).name == "response0"
+    assert len(sent) == 1
+
+
+def test_deadline_stops_retrying(monkeypatch):
+    client = HttpClient()
+    client.cache = None
+    attempts = []
+
+    def attempt(url, endpoint, priority, timeout=None, **kwargs):
+        attempts.append(timeout)
+        return FakeResponse("busy", 503, {"Retry-After": "10"})
+
+    monkeypatch.setattr(client, "_attempt", attempt)
+    start = time.monotonic()
+    with client.deadline(1.0), pytest.raises(DeadlineExceeded):
+        client.get(URL)
+
+    assert time.monotonic() - start < 1.0
+    assert len(attempts) == 1
+    # The request's own timeouts were capped at the time left.
+    assert all(t <= 1.0 for t in attempts[0])
+
+
+def test_download_deadline_applies_to_every_request(upstream):
+    kernel = create_default_kernel()
+
+    with pytest.raises(DeadlineExceeded):
+        kernel["downloader"].download(fakeapi.BOOK, config.OUTPUT_DIR, formats=["markdown"], deadline=1e-6)
+    assert not upstream.hits
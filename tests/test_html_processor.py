@@ -0,0 +1,51 @@
+from pathlib import Path
+
+import pytest
+
+import config
+from core import create_default_kernel
+from plugins.html_processor import HtmlProcessorPlugin
+
+BOOK = "9781000000001"
+FIXTURES = sorted((Path(__file__).parent / "fixtures" / "html").glob("*.html"))
+
+
+@pytest.fixture
+def processor():
+    return create_default_kernel()["html_processor"]
+
+
+@pytest.mark.parametrize("skip_images", [False, True])
+@pytest.mark.parametrize("fixture", FIXTURES, ids=lambda p: p.stem)
+def test_lxml_matches_bs4(processor, fixture, skip_images):
+    html = fixture.read_text(encoding="utf-8")
+
+    result = processor._process_lxml(html, BOOK, skip_images)
+
+    assert result is not None
+    assert result == processor._process_bs4(html, BOOK, skip_images)
+
+
+def test_lxml_falls_back_to_bs4_without_a_body(processor, monkeypatch):
+    monkeypatch.setattr(config, "HTML_PROCESSOR", "lxml")
+
+    assert processor._process_lxml("", BOOK, False) is None
+    assert processor.process("", BOOK) == processor._process_bs4("", BOOK, False)
+
+
+@pytest.mark.parametrize("name", ["bs4", "lxml"])
+def test_downloader_uses_the_configured_processor(name, upstream, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "HTML_PROCESSOR", name)
+    used = []
+    for variant in ("bs4", "lxml"):
+        method = getattr(HtmlProcessorPlugin, f"_process_{variant}")
+
+        def spy(self, *args, variant=variant, method=method):
+            used.append(variant)
+            return method(self, *args)
+
+        monkeypatch.setattr(HtmlProcessorPlugin, f"_process_{variant}", spy)
+
+    create_default_kernel()["downloader"].download(BOOK, tmp_path, formats=["markdown"])
+
+    assert set(used) == {name}
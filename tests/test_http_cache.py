@@ -0,0 +1,29 @@
+from core.http_client import HttpClient
+from tests import fakeapi
+
+
+def test_revalidates_and_serves_the_cached_body_on_304(upstream):
+    url = f"{upstream.base_url}/api/v2/epubs/urn:orm:book:{fakeapi.BOOK}/files/ch1.html"
+    path = url.removeprefix(upstream.base_url)
+
+    first = HttpClient().get(url)
+    # A fresh client reads the same on-disk cache.
+    second = HttpClient().get(url)
+
+    [(_, plain), (_, conditional)] = [r for r in upstream.requests if r[0] == path]
+    assert "If-None-Match" not in plain
+    assert conditional["If-None-Match"] == first.headers["ETag"]
+    assert conditional["If-Modified-Since"] == fakeapi.LAST_MODIFIED
+    assert second.status_code == 200
+    assert second.text == first.text == fakeapi.chapter_html(1)
+
+
+def test_uncached_requests_skip_the_validators(upstream):
+    url = f"{upstream.base_url}/api/v2/epubs/urn:orm:book:{fakeapi.BOOK}/files/ch2.html"
+    client = HttpClient()
+
+    client.get(url)
+    response = client.get(url, use_cache=False)
+
+    assert response.text == fakeapi.chapter_html(2)
+    assert all("If-None-Match" not in headers for _, headers in upstream.requests)
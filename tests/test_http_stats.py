@@ -0,0 +1,52 @@
+import requests
+
+from core.http_stats import HttpStats
+
+
+def test_snapshot_counts_requests_per_endpoint():
+    stats = HttpStats()
+    stats.record("content", 200, 0.2, nbytes=100, limiter_wait=0.5)
+    stats.record("content", 503, 0.4)
+    stats.record("content", None, 1.0)
+    stats.record_coalesced("content")
+    stats.record_hedge("content")
+    stats.record_hedge("content", won=True)
+    stats.add_bytes("content", 50)
+
+    snapshot = stats.snapshot()["content"]
+
+    assert snapshot["requests"] == 3
+    assert snapshot["errors"] == 1
+    assert snapshot["statuses"] == {"200": 1, "503": 1}
+    assert snapshot["coalesced"] == 1
+    assert (snapshot["hedged"], snapshot["hedge_wins"]) == (1, 1)
+    assert snapshot["bytes"] == 150
+    assert snapshot["latency_avg"] == round(1.6 / 3, 4)
+    assert snapshot["latency_p50"] == 0.4
+    assert snapshot["latency_histogram"]["le_0.25"] == 1
+    assert snapshot["limiter_wait"] == 0.5
+
+
+def test_snapshot_with_only_coalesced_callers():
+    stats = HttpStats()
+    stats.record_coalesced("search")
+
+    snapshot = stats.snapshot()["search"]
+
+    assert snapshot["requests"] == 0
+    assert snapshot["coalesced"] == 1
+    assert snapshot["latency_avg"] is None
+    assert snapshot["latency_p95"] is None
+
+
+def test_stats_endpoint(web):
+    web.kernel.http.stats.record("search", 200, 0.1)
+    web.kernel.http.stats.record_coalesced("epub")
+
+    response = requests.get(f"{web.base_url}/api/stats", timeout=5)
+
+    assert response.status_code == 200
+    endpoints = response.json()["endpoints"]
+    assert endpoints["search"]["requests"] == 1
+    assert endpoints["epub"]["coalesced"] == 1
+    assert endpoints["epub"]["latency_avg"] is None
@@ -0,0 +1,84 @@
+import io
+
+import pytest
+
+import config
+from core import create_default_kernel
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def _photo(fmt: str, width: int = 200) -> bytes:
+    img = Image.merge("RGB", [Image.effect_noise((width, 100), sigma) for sigma in (32, 64, 96)])
+    buffer = io.BytesIO()
+    img.save(buffer, fmt, quality=95)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def optimizer():
+    return create_default_kernel()["image_optimizer"]
+
+
+def test_unscaled_jpeg_keeps_its_bytes(optimizer, tmp_path):
+    path = tmp_path / "photo.jpg"
+    source = _photo("JPEG")
+    path.write_bytes(source)
+
+    assert optimizer.optimize_file(path) == "photo.jpg"
+    assert path.read_bytes() == source
+
+
+def test_photographic_png_stays_png_by_default(optimizer, tmp_path):
+    path = tmp_path / "photo.png"
+    path.write_bytes(_photo("PNG"))
+
+    assert optimizer.optimize_file(path) == "photo.png"
+    with Image.open(path) as img:
+        assert img.format == "PNG"
+
+
+def test_photographic_png_becomes_jpeg_when_opted_in(optimizer, tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "IMAGE_PNG_TO_JPEG", True)
+    path = tmp_path / "photo.png"
+    path.write_bytes(_photo("PNG"))
+
+    assert optimizer.optimize_file(path) == "photo.jpg"
+
+
+def test_wide_jpeg_is_scaled_down(optimizer, tmp_path):
+    path = tmp_path / "wide.jpg"
+    path.write_bytes(_photo("JPEG", width=2000))
+
+    optimizer.optimize_file(path)
+    with Image.open(path) as img:
+        assert img.width == int(config.IMAGE_TARGET_DPI * config.IMAGE_PAGE_WIDTH_INCHES)
+
+
+def test_renamed_images_are_renamed_in_stylesheets(upstream, tmp_path, monkeypatch):
+    import zipfile
+
+    from tests import fakeapi
+
+    monkeypatch.setattr(config, "IMAGE_OPTIMIZE", True)
+    monkeypatch.setattr(config, "IMAGE_PNG_TO_JPEG", True)
+    monkeypatch.setattr(fakeapi, "PNG", _photo("PNG"))
+
+    create_default_kernel()["downloader"].download(fakeapi.BOOK, tmp_path, formats=["epub"])
+
+    # bg.png is only used by the shared stylesheet.
+    [epub] = tmp_path.rglob("*.epub")
+    with zipfile.ZipFile(epub) as archive:
+        css = archive.read("OEBPS/Styles/Style00.css").decode()
+        names = set(archive.namelist())
+    assert "url('assets/bg.jpg')" in css
+    assert "OEBPS/Images/bg.jpg" in names
+    assert "OEBPS/Images/bg.png" not in names
+
+
+def test_rewrite_references_covers_inline_styles(optimizer):
+    html = '<img src="Images/a.png"/><div style="background: url(Images/b.png?v=1)"></div>'
+
+    assert optimizer.rewrite_references(html, {"a.png": "a.jpg", "b.png": "b.jpg"}) == (
+        '<img src="Images/a.jpg"/><div style="background: url(Images/b.jpg?v=1)"></div>'
+    )
@@ -0,0 +1,66 @@
+import threading
+import time
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+from core.http_client import HttpClient
+from core.pagination import page_urls
+
+BASE = "https://learning.oreilly.com/api/v2/epub-chapters/?epub_identifier=x"
+
+
+def _listing(items: int, size: int, scheme: str, grown: int = 0):
+    """A fake paginated API over ``items`` results; later pages answer first."""
+    requested = []
+    lock = threading.Lock()
+
+    def get_json(url, **kwargs):
+        query = parse_qs(urlparse(url).query)
+        if scheme == "page":
+            index = int(query.get("page", ["1"])[0]) - 1
+            next_url = f"{BASE}&page={index + 2}"
+        else:
+            index = int(query.get("offset", ["0"])[0]) // size
+            next_url = f"{BASE}&offset={(index + 1) * size}"
+        with lock:
+            requested.append(index)
+            # The listing grows once the first page has been read.
+            total = items + (grown if len(requested) > 1 else 0)
+        time.sleep(0.01 * (10 - index) if index else 0)
+        results = list(range(index * size, min(total, (index + 1) * size)))
+        return {
+            "count": total,
+            "next": next_url if (index + 1) * size < total else None,
+            "results": results,
+        }
+
+    return get_json, requested
+
+
+@pytest.mark.parametrize("scheme", ["page", "offset"])
+def test_pages_come_back_in_order_with_a_short_last_page(monkeypatch, scheme):
+    client = HttpClient()
+    get_json, requested = _listing(items=7, size=3, scheme=scheme)
+    monkeypatch.setattr(client, "get_json", get_json)
+
+    pages = client.get_pages(BASE)
+
+    assert [page["results"] for page in pages] == [[0, 1, 2], [3, 4, 5], [6]]
+    assert sorted(requested) == [0, 1, 2]
+
+
+def test_listing_that_grew_is_followed_by_next_links(monkeypatch):
+    client = HttpClient()
+    get_json, requested = _listing(items=6, size=3, scheme="page", grown=2)
+    monkeypatch.setattr(client, "get_json", get_json)
+
+    pages = client.get_pages(BASE)
+
+    assert [r for page in pages for r in page["results"]] == list(range(8))
+    assert requested[-1] == 2
+
+
+def test_single_page_needs_no_more_requests():
+    assert page_urls({"count": 2, "next": None, "results": [1, 2]}) == []
+    assert page_urls({"count": 5, "next": f"{BASE}&cursor=abc", "results": [1, 2]}) == []
@@ -0,0 +1,69 @@
+from core import create_default_kernel
+from plugins.planner import CHAPTER, IMAGE, STYLESHEET, FetchPlan
+from tests import fakeapi
+
+MANIFEST = f"/api/v2/epubs/urn:orm:book:{fakeapi.BOOK}/files/"
+
+
+def _book(kernel):
+    return kernel["book"].fetch(fakeapi.BOOK), kernel["chapters"].fetch_list(fakeapi.BOOK)
+
+
+def test_unknown_sizes_weigh_the_average_known_size():
+    plan = FetchPlan()
+    plan.add("a", CHAPTER, 100)
+    plan.add("b", IMAGE)
+    assert plan.weight("b") == 100
+
+    plan.add("c", IMAGE, 300)
+    assert plan.weight("b") == 200
+    assert plan.total_weight() == 600
+
+
+def test_largest_files_are_fetched_first():
+    plan = FetchPlan()
+    plan.add("small", IMAGE, 10)
+    plan.add("unknown", IMAGE)
+    plan.add("big", IMAGE, 1000)
+    plan.add("medium", IMAGE, 200)
+
+    # "unknown" weighs the average known size, 403.
+    assert plan.largest_first(plan.urls(IMAGE)) == ["big", "unknown", "medium", "small"]
+
+
+def test_plan_uses_manifest_sizes_and_caches_the_manifest(upstream):
+    kernel = create_default_kernel()
+    book_info, chapters = _book(kernel)
+
+    plan = kernel["planner"].plan(book_info, chapters)
+
+    content = plan.urls(CHAPTER)
+    assert content == [ch["content_url"] for ch in chapters]
+    assert [plan.weight(url) for url in content] == [len(fakeapi.chapter_html(i)) for i in range(fakeapi.CHAPTERS)]
+    assert len(plan.urls(STYLESHEET)) == 1
+    assert upstream.hits[MANIFEST] == 1
+
+    # Another process plans from the cached manifest.
+    kernel = create_default_kernel()
+    again = kernel["planner"].plan(*_book(kernel))
+    assert again.files == plan.files
+    assert upstream.hits[MANIFEST] == 1
+
+
+def test_small_selection_skips_an_uncached_manifest(upstream):
+    kernel = create_default_kernel()
+    book_info, chapters = _book(kernel)
+
+    plan = kernel["planner"].plan(book_info, chapters[:1], fetch_manifest=False)
+
+    assert upstream.hits[MANIFEST] == 0
+    assert plan.urls(CHAPTER) == [chapters[0]["content_url"]]
+    assert {plan.weight(url) for url in plan.files} == {1}
+
+
+def test_downloading_a_few_chapters_skips_the_manifest(upstream, tmp_path):
+    kernel = create_default_kernel()
+
+    kernel["downloader"].download(fakeapi.BOOK, tmp_path, formats=["markdown"], selected_chapters=[0])
+
+    assert upstream.hits[MANIFEST] == 0
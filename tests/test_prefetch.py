@@ -0,0 +1,31 @@
+import pytest
+import requests
+
+from tests import fakeapi
+
+CHAPTER_LIST = f"/api/v2/epub-chapters/?epub_identifier=urn:orm:book:{fakeapi.BOOK}"
+
+
+def _open(web, path):
+    response = requests.get(f"{web.base_url}{path}", timeout=5)
+    assert response.status_code == 200
+    return response.json()
+
+
+def _prefetch_done(web):
+    web.kernel["downloader"]._prefetched.get(fakeapi.BOOK).result(timeout=5)
+
+
+@pytest.mark.parametrize("chapters_first", [True, False])
+def test_opening_a_book_fetches_the_chapter_list_once(upstream, web, chapters_first):
+    if chapters_first:
+        listed = _open(web, f"/api/book/{fakeapi.BOOK}/chapters")
+        _open(web, f"/api/book/{fakeapi.BOOK}")
+        _prefetch_done(web)
+    else:
+        _open(web, f"/api/book/{fakeapi.BOOK}")
+        _prefetch_done(web)
+        listed = _open(web, f"/api/book/{fakeapi.BOOK}/chapters")
+
+    assert listed["total"] == fakeapi.CHAPTERS
+    assert upstream.hits[CHAPTER_LIST] == 1
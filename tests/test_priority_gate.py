@@ -0,0 +1,71 @@
+import threading
+import time
+
+from core.rate_limiter import BULK, INTERACTIVE, METADATA, PriorityGate
+
+
+class SteppedBucket:
+    """Hands out a token only when the test allows it."""
+
+    def __init__(self):
+        self.tokens = threading.Semaphore(0)
+
+    def acquire(self) -> float:
+        self.tokens.acquire()
+        return 0.0
+
+
+def _wait_for(condition, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+
+def _run(gate: PriorityGate, bucket: SteppedBucket, waiters: list[str]) -> list[str]:
+    """Queue ``waiters`` behind a bulk request holding the bucket; return the order they are served."""
+    served = []
+
+    def request(priority, name):
+        gate.acquire(priority)
+        served.append(name)
+
+    holder = threading.Thread(target=request, args=(BULK, "holder"))
+    holder.start()
+    _wait_for(lambda: gate._busy)
+    threads = []
+    for i, priority in enumerate(waiters):
+        thread = threading.Thread(target=request, args=(priority, f"{priority}{i}"))
+        thread.start()
+        threads.append(thread)
+        _wait_for(lambda: sum(gate.queued().values()) == i + 1)
+
+    for step in range(len(waiters) + 1):
+        bucket.tokens.release()
+        _wait_for(lambda: len(served) == step + 1)
+    for thread in [holder, *threads]:
+        thread.join()
+    return served[1:]
+
+
+def test_interactive_goes_ahead_of_queued_bulk():
+    bucket = SteppedBucket()
+    gate = PriorityGate(bucket, bulk_share=0)
+
+    served = _run(gate, bucket, [BULK, BULK, METADATA, INTERACTIVE, METADATA, INTERACTIVE])
+
+    assert served == ["interactive3", "interactive5", "metadata2", "metadata4", "bulk0", "bulk1"]
+
+
+def test_bulk_keeps_its_minimum_share():
+    bucket = SteppedBucket()
+    gate = PriorityGate(bucket, bulk_share=0.2)
+
+    served = _run(gate, bucket, [BULK, BULK, BULK] + [INTERACTIVE] * 6)
+
+    # Every fifth turn goes to bulk while any is waiting.
+    assert [name.rstrip("0123456789") for name in served] == [
+        "interactive", "interactive", "interactive", "interactive", "bulk",
+        "interactive", "interactive", "bulk", "bulk",
+    ]
+    assert [name for name in served if name.startswith("bulk")] == ["bulk0", "bulk1", "bulk2"]
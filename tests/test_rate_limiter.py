@@ -0,0 +1,136 @@
+import pytest
+
+from core import rate_limiter
+from core.rate_limiter import AdaptiveRateController, ConcurrencyLimiter, SharedTokenBucket, TokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    return clock
+
+
+def _controller(rate=2.0, concurrency=4):
+    return AdaptiveRateController(
+        TokenBucket(rate=rate),
+        ConcurrencyLimiter(concurrency),
+        min_rate=0.2,
+        max_rate=2.5,
+        max_concurrency=concurrency,
+        increase=0.05,
+        increase_interval=1.0,
+        decrease=0.5,
+        slow_threshold=10.0,
+    )
+
+
+def test_joining_a_shared_bucket_keeps_a_back_off(tmp_path):
+    db = tmp_path / "rate_limit.db"
+    first = SharedTokenBucket(db, rate=2.0)
+    first.update_rate(lambda r: r / 2)
+
+    second = SharedTokenBucket(db, rate=2.0)
+    assert second.rate == 1.0
+    assert first.rate == 1.0
+
+    # A lower configured rate still applies.
+    SharedTokenBucket(db, rate=0.5)
+    assert first.rate == 0.5
+
+
+def test_idle_shared_bucket_starts_over(tmp_path, clock):
+    db = tmp_path / "rate_limit.db"
+    first = SharedTokenBucket(db, rate=2.0)
+    first.update_rate(lambda r: r / 4)
+
+    clock.sleep(SharedTokenBucket.STALE_SECONDS + 1)
+    restarted = SharedTokenBucket(db, rate=2.0)
+    assert restarted.rate == 2.0
+
+
+def test_shared_bucket_grows_once_per_interval(tmp_path):
+    db = tmp_path / "rate_limit.db"
+    processes = [SharedTokenBucket(db, rate=1.0) for _ in range(3)]
+
+    grown = [bucket.grow_rate(0.5, max_rate=10.0) for bucket in processes]
+    assert grown == [True, False, False]
+    assert processes[0].rate == 1.5
+
+
+def test_grow_rate_respects_max_and_interval(clock):
+    bucket = TokenBucket(rate=100.0)
+    assert bucket.grow_rate(1.0, max_rate=100.5, interval=1.0)
+    assert bucket.rate == 100.5
+    clock.sleep(0.5)
+    assert not bucket.grow_rate(1.0, max_rate=200.0, interval=1.0)
+    clock.sleep(0.5)
+    assert bucket.grow_rate(1.0, max_rate=200.0, interval=1.0)
+    assert bucket.rate == 101.5
+
+
+def test_grow_rate_never_lowers_a_rate_above_max(clock):
+    bucket = TokenBucket(rate=1000.0)
+    assert not bucket.grow_rate(1.0, max_rate=2.5)
+    assert bucket.rate == 1000.0
+
+
+def test_rate_grows_linearly_in_time(clock):
+    control = _controller()
+    # Ten healthy responses per second for ten seconds.
+    for _ in range(100):
+        control.on_response(200, latency=0.05)
+        clock.sleep(0.1)
+
+    assert control.bucket.rate == pytest.approx(2.5)
+    control.bucket.set_rate(1.0)
+    for _ in range(100):
+        control.on_response(200, latency=0.05)
+        clock.sleep(0.1)
+    assert control.bucket.rate == pytest.approx(1.5)
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_throttling_halves_rate_and_concurrency(clock, status):
+    control = _controller()
+
+    control.on_response(status, latency=0.05)
+    # A burst of errors within the cooldown counts once.
+    control.on_response(status, latency=0.05)
+
+    assert control.bucket.rate == 1.0
+    assert control.slots.limit == 2
+    [event] = control.events
+    assert event.reason == str(status)
+
+
+def test_retry_after_pauses_the_bucket(clock):
+    control = _controller()
+
+    control.on_response(429, latency=0.05, retry_after=30.0)
+
+    waited = control.bucket.acquire()
+    assert waited >= 30.0
+    assert control.events[-1].retry_after == 30.0
+
+
+def test_update_rate_is_shared(tmp_path):
+    db = tmp_path / "rate_limit.db"
+    a = SharedTokenBucket(db, rate=2.0)
+    b = SharedTokenBucket(db, rate=2.0)
+    assert a.update_rate(lambda r: r / 2) == 1.0
+    assert b.update_rate(lambda r: r / 2) == 0.5
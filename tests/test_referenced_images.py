@@ -0,0 +1,26 @@
+import zipfile
+
+from core import create_default_kernel
+from tests import fakeapi
+from utils import css_image_names
+
+
+def test_css_image_names():
+    css = """
+        .a { background: url(../images/bg.png) }
+        .b { background-image: URL( "icons/tip.svg?v=2#x" ) }
+        .c { background: url('data:image/png;base64,AAAA') }
+    """
+    assert css_image_names(css) == {"bg.png", "tip.svg"}
+
+
+def test_images_used_only_by_stylesheets_are_kept(upstream, tmp_path):
+    kernel = create_default_kernel()
+    result = kernel["downloader"].download(fakeapi.BOOK, tmp_path, formats=["epub"])
+
+    with zipfile.ZipFile(result.files["epub"]) as epub:
+        images = {name.rsplit("/", 1)[-1] for name in epub.namelist() if "/Images/" in name}
+        opf = epub.read("OEBPS/content.opf").decode()
+    assert "bg.png" in images and "Images/bg.png" in opf
+    assert "unused.png" not in images
+    assert not any(path.endswith("/assets/unused.png") for path in upstream.hits)
@@ -0,0 +1,80 @@
+import pytest
+import requests
+
+from core import create_default_kernel
+from tests import fakeapi
+
+ISBN = "9781000000001"
+
+
+def _not_found(url):
+    response = requests.Response()
+    response.status_code = 404
+    response.url = url
+    return requests.HTTPError("404", response=response)
+
+
+def _book(monkeypatch):
+    book = create_default_kernel()["book"]
+    requested = []
+
+    def get_json(url, **kwargs):
+        requested.append(url)
+        if "/search/" in url:
+            if "query=9789990000000" in url:
+                return {"results": []}
+            return {"results": [
+                {"archive_id": "video-1", "title": "A video", "content_format": "video"},
+                {"archive_id": "0636920000001", "title": "The book", "content_format": "book"},
+            ]}
+        raise _not_found(url)
+
+    monkeypatch.setattr(book.http, "get_json", get_json)
+    book.requested = requested
+    return book
+
+
+@pytest.fixture
+def book(monkeypatch):
+    return _book(monkeypatch)
+
+
+def test_isbn_is_searched_before_fetching(book):
+    [result] = book.resolve_many(["978-1-000-00000-1"])
+
+    assert result["status"] == "resolved"
+    assert result["book"]["id"] == "0636920000001"
+    assert result["input"] == "978-1-000-00000-1"
+    assert not any("/epubs/" in url for url in book.requested)
+    assert any(url.endswith(f"query={ISBN}&limit=10") for url in book.requested)
+
+
+def test_first_book_result_wins_over_other_formats(book):
+    [result] = book.resolve_many(["some-book-id"])
+    assert result["book"]["id"] == "0636920000001"
+
+
+def test_unmatched_isbn_falls_back_to_fetch(book):
+    [result] = book.resolve_many(["9789990000000"])
+    assert result["status"] == "not_found"
+    assert any("/epubs/urn:orm:book:9789990000000/" in url for url in book.requested)
+
+
+def test_resolutions_are_cached_across_processes(upstream):
+    [first] = create_default_kernel()["book"].resolve_many([fakeapi.BOOK])
+    sent = sum(upstream.hits.values())
+
+    [again] = create_default_kernel()["book"].resolve_many([fakeapi.BOOK])
+
+    assert again == first
+    assert sum(upstream.hits.values()) == sent
+
+
+def test_misses_are_cached_across_processes(monkeypatch):
+    _book(monkeypatch).resolve_many(["9789990000000"])
+
+    book = _book(monkeypatch)
+    [result] = book.resolve_many(["9789990000000"])
+
+    assert result["status"] == "not_found"
+    assert book.requested == []
@@ -0,0 +1,76 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from core import create_default_kernel
+from core.rate_limiter import BULK, PriorityGate, TokenBucket
+from core.retry import RequestCancelled
+from plugins import SearchCancelled
+from web.server import DownloaderHandler
+
+
+def test_search_cancelled_after_waiting_for_token_is_not_sent(upstream):
+    book = create_default_kernel()["book"]
+    checks = iter([False])
+
+    def cancelled():
+        # Superseded while the request waited for its token.
+        return next(checks, True)
+
+    with pytest.raises(SearchCancelled):
+        book.search("python", cancelled=cancelled)
+    assert not any(path.startswith("/api/v2/search/") for path in upstream.hits)
+
+
+def test_gate_drops_cancelled_waiter():
+    gate = PriorityGate(TokenBucket(rate=2.0, capacity=1.0))
+    gate.acquire(BULK)
+    holder = threading.Thread(target=gate.acquire, args=(BULK,))
+    holder.start()
+    time.sleep(0.05)
+
+    cancel = threading.Event()
+    threading.Timer(0.1, cancel.set).start()
+    start = time.monotonic()
+    with pytest.raises(RequestCancelled):
+        gate.acquire(BULK, cancelled=cancel.is_set)
+    assert time.monotonic() - start < 0.4
+    assert gate.queued()[BULK] == 0
+    holder.join()
+
+
+def _hit(book_id, title, description=""):
+    return {"archive_id": book_id, "title": title, "description": description, "content_format": "book"}
+
+
+@pytest.fixture
+def book():
+    return create_default_kernel()["book"]
+
+
+def test_refines_exhaustive_results_on_whole_words(book):
+    book._remember_search("python", 10, {"results": [
+        _hit("1", "Python and Go"),
+        _hit("2", "Python Gophers"),
+        _hit("3", "Fluent Python", description="Comparisons with Go."),
+    ]})
+    assert [r["id"] for r in book._cached_search("python go", 10)] == ["1", "3"]
+
+
+def test_does_not_refine_a_truncated_page(book):
+    book._remember_search("python", 2, {"results": [_hit("1", "Python and Go"), _hit("2", "Python")]})
+    assert book._cached_search("python go", 2) is None
+
+
+def test_does_not_refine_on_punctuated_words(book):
+    book._remember_search("python", 10, {"results": [_hit("1", "Python and C++")]})
+    assert book._cached_search("python c++", 10) is None
+
+
+def test_finished_searches_leave_no_tokens_behind(upstream, web):
+    for client in ("a", "b", "c"):
+        response = requests.get(f"{web.base_url}/api/search", params={"q": "python", "client": client}, timeout=5)
+        assert response.json()["results"]
+    assert DownloaderHandler._latest_search == {}
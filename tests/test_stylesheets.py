@@ -0,0 +1,29 @@
+import zipfile
+
+from core import create_default_kernel
+from tests import fakeapi
+
+FILES = f"/api/v2/epubs/urn:orm:book:{fakeapi.BOOK}/files"
+
+
+def test_stylesheet_shared_by_chapters_is_fetched_once(upstream, tmp_path):
+    kernel = create_default_kernel()
+
+    kernel["downloader"].download(fakeapi.BOOK, tmp_path, formats=["epub"])
+
+    assert fakeapi.CHAPTERS > 1
+    assert upstream.hits[f"{FILES}/style.css"] == 1
+    [epub] = tmp_path.rglob("*.epub")
+    with zipfile.ZipFile(epub) as archive:
+        assert [n for n in archive.namelist() if n.endswith(".css")] == ["OEBPS/Styles/Style00.css"]
+
+
+def test_identical_stylesheets_share_one_file(upstream, tmp_path):
+    assets = create_default_kernel()["assets"]
+    urls = [f"{upstream.base_url}{FILES}/{name}.css" for name in ("a", "b", "a")]
+
+    saved = assets.download_all_css(urls, tmp_path)
+
+    assert set(saved.values()) == {tmp_path / "Styles" / "Style00.css"}
+    assert (tmp_path / "Styles" / "Style00.css").read_text() == fakeapi.STYLESHEET
+    assert upstream.hits[f"{FILES}/a.css"] == upstream.hits[f"{FILES}/b.css"] == 1
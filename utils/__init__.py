@@ -1,5 +1,6 @@
 """Shared utilities for O'Reilly Downloader."""
 
+from .css import css_image_names, rewrite_css_urls
 from .files import sanitize_filename, slugify
 
-__all__ = ["sanitize_filename", "slugify"]
+__all__ = ["css_image_names", "rewrite_css_urls", "sanitize_filename", "slugify"]
@@ -0,0 +1,34 @@
+"""Helpers for reading stylesheets."""
+
+import re
+
+_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+?)\1\s*\)""", re.IGNORECASE)
+
+
+def css_image_names(css: str) -> set[str]:
+    """File names of everything a stylesheet (or style attribute) loads via ``url(...)``."""
+    names = set()
+    for _, url in _URL_RE.findall(css):
+        if url.startswith("data:"):
+            continue
+        name = url.split("#", 1)[0].split("?", 1)[0].rstrip("/").split("/")[-1]
+        if name:
+            names.add(name)
+    return names
+
+
+def rewrite_css_urls(css: str, renames: dict[str, str]) -> str:
+    """Point ``url(...)`` references at renamed files (old name -> new name)."""
+    if not renames:
+        return css
+
+    def replace(match: re.Match) -> str:
+        quote, url = match.groups()
+        path, suffix = re.match(r"([^?#]*)(.*)", url, re.DOTALL).groups()
+        directory, _, name = path.rpartition("/")
+        if url.startswith("data:") or name not in renames:
+            return match.group(0)
+        new_path = f"{directory}/{renames[name]}" if directory else renames[name]
+        return f"url({quote}{new_path}{suffix}{quote})"
+
+    return _URL_RE.sub(replace, css)
@@ -1,14 +1,17 @@
 """Web server for O'Reilly Ingest."""
 
+import hashlib
+import itertools
 import json
 import re
 import threading
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from urllib.parse import parse_qs, urlparse
 
 from core import Kernel, create_default_kernel
-from plugins import ChunkConfig
+from core.rate_limiter import INTERACTIVE, METADATA
+from plugins import BookNotFoundError, ChunkConfig, SearchCancelled
 from plugins.downloader import DownloadProgress
 import config
 
@@ -20,6 +23,9 @@ class DownloaderHandler(SimpleHTTPRequestHandler):
     download_progress: dict = {}
     _progress_lock = threading.Lock()
     _cancel_requested: bool = False
+    _search_tickets = itertools.count()
+    _latest_search: dict[str, int] = {}
+    _search_lock = threading.Lock()
 
     @classmethod
     def _set_progress(cls, data: dict):
@@ -38,6 +44,11 @@ class DownloaderHandler(SimpleHTTPRequestHandler):
         super().__init__(*args, directory=str(self.static_dir), **kwargs)
 
     def do_GET(self):
+        # Anything the UI waits on goes ahead of a running download's traffic.
+        with self.kernel.http.priority(INTERACTIVE):
+            self._dispatch_get()
+
+    def _dispatch_get(self):
         parsed = urlparse(self.path)
         path = parsed.path
 
@@ -46,17 +57,25 @@ class DownloaderHandler(SimpleHTTPRequestHandler):
         elif path == "/api/search":
             params = parse_qs(parsed.query)
             query = params.get("q", params.get("query", [""]))[0]
-            self._handle_search(query)
+            client = params.get("client", [self.client_address[0]])[0]
+            self._handle_search(query, client)
         elif match := re.match(r"/api/book/([^/]+)/chapters$", path):
             self._handle_chapters_list(match.group(1))
         elif match := re.match(r"/api/book/([^/]+)$", path):
             self._handle_book_info(match.group(1))
+        elif match := re.match(r"/api/cover/([\w-]+)$", path):
+            params = parse_qs(parsed.query)
+            self._handle_cover(match.group(1), params.get("w", [""])[0])
         elif path == "/api/progress":
             self._handle_progress()
         elif path == "/api/settings":
             self._handle_get_settings()
         elif path == "/api/formats":
             self._handle_formats()
+        elif path == "/api/rate-limit":
+            self._send_json(self.kernel.http.rate_status())
+        elif path == "/api/stats":
+            self._send_json({"endpoints": self.kernel.http.stats.snapshot()})
         else:
             super().do_GET()
 
@@ -75,6 +94,8 @@ class DownloaderHandler(SimpleHTTPRequestHandler):
             self._handle_reveal(data)
         elif self.path == "/api/settings/output-dir":
             self._handle_set_output_dir(data)
+        elif self.path == "/api/books/resolve":
+            self._handle_resolve_books(data)
         else:
             self._send_json({"error": "Not found"}, 404)
 
@@ -83,28 +104,59 @@ class DownloaderHandler(SimpleHTTPRequestHandler):
         status = auth.get_status()
         self._send_json(status)
 
-    def _handle_search(self, query: str):
+    def _handle_search(self, query: str, client: str):
         if not query:
             self._send_json({"results": []})
             return
 
+        # A newer search from the same client supersedes this one; if that
+        # happens before it goes upstream, skip the request altogether.
+        # Entries only live while their search runs, so the dict stays small.
+        ticket = next(self._search_tickets)
+        with self._search_lock:
+            self._latest_search[client] = ticket
+
+        def superseded() -> bool:
+            return self._latest_search.get(client) != ticket
+
         book = self.kernel["book"]
-        results = book.search(query)
+        try:
+            results = book.search(query, cancelled=superseded)
+        except SearchCancelled:
+            self._send_json({"results": [], "cancelled": True})
+            return
+        finally:
+            with self._search_lock:
+                if self._latest_search.get(client) == ticket:
+                    del self._latest_search[client]
         self._send_json({"results": results})
 
     def _handle_book_info(self, book_id: str):
         book = self.kernel["book"]
         try:
             info = book.fetch(book_id)
+            # The user is likely to download next; warm up what that needs.
+            self.kernel["downloader"].prefetch(book_id)
             self._send_json(info)
+        except BookNotFoundError as e:
+            self._send_json({"error": str(e)}, 404)
         except Exception as e:
             self._send_json({"error": str(e)}, 400)
 
+    def _handle_resolve_books(self, data: dict):
+        """Resolve a list of ISBNs or book IDs; one result per input, in order."""
+        identifiers = data.get("ids")
+        if not isinstance(identifiers, list) or not all(isinstance(i, str) for i in identifiers):
+            self._send_json({"error": "ids must be a list of strings"}, 400)
+            return
+        results = self.kernel["book"].resolve_many(identifiers)
+        self._send_json({"results": results})
+
     def _handle_chapters_list(self, book_id: str):
         """Return list of chapters for chapter selection UI."""
-        chapters_plugin = self.kernel["chapters"]
         try:
-            chapters = chapters_plugin.fetch_list(book_id)
+            # Shared with the prefetch that opening the book started.
+            chapters = self.kernel["downloader"].chapter_list(book_id)
             result = {
                 "chapters": [
                     {
@@ -121,6 +173,42 @@ class DownloaderHandler(SimpleHTTPRequestHandler):
         except Exception as e:
             self._send_json({"error": str(e)}, 400)
 
+    def _handle_cover(self, book_id: str, width: str):
+        """Serve a cached cover thumbnail with a long max-age and an ETag."""
+        widths = sorted(config.COVER_THUMBNAIL_WIDTHS)
+        requested = int(width) if width.isdigit() else widths[0]
+        width = next((w for w in widths if w >= requested), widths[-1])
+
+        assets = self.kernel["assets"]
+        try:
+            # A page of results asks for many covers; keep them behind search.
+            with self.kernel.http.priority(METADATA):
+                path = assets.cover_thumbnail(book_id, width)
+        except ImportError:
+            self.send_response(302)
+            self.send_header("Location", assets.get_cover_url(book_id))
+            self.end_headers()
+            return
+        except Exception as e:
+            status = getattr(getattr(e, "response", None), "status_code", None)
+            self._send_json({"error": str(e)}, 404 if status == 404 else 502)
+            return
+
+        data = path.read_bytes()
+        etag = f'"{hashlib.sha256(data).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "image/jpeg")
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Cache-Control", f"public, max-age={config.COVER_MAX_AGE}")
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(data)
+
     def _handle_progress(self):
         with self._progress_lock:
             self._send_json(dict(self.download_progress))
@@ -296,6 +384,7 @@ class DownloaderHandler(SimpleHTTPRequestHandler):
                 chunk_config=chunk_config,
                 progress_callback=self._on_progress,
                 cancel_check=lambda: DownloaderHandler._cancel_requested,
+                deadline=config.DOWNLOAD_DEADLINE,
             )
 
             self._set_progress(
@@ -340,12 +429,18 @@ class DownloaderHandler(SimpleHTTPRequestHandler):
         print(f"[HTTP] {args[0]}")
 
 
-def create_server(host: str = "localhost", port: int = 8000) -> HTTPServer:
-    """Create and configure the HTTP server."""
+def create_server(host: str = "localhost", port: int = 8000) -> ThreadingHTTPServer:
+    """Create and configure the HTTP server.
+
+    Requests are handled on their own threads so the UI's parallel calls
+    (book info, chapter list, search) overlap and can share upstream
+    fetches through the HTTP client's request coalescing.
+    """
     kernel = create_default_kernel()
     DownloaderHandler.kernel = kernel
 
-    server = HTTPServer((host, port), DownloaderHandler)
+    server = ThreadingHTTPServer((host, port), DownloaderHandler)
+    server.daemon_threads = True
     return server
 
 
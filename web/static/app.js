@@ -8,13 +8,16 @@ let currentExpandedCard = null;
 let selectedResultIndex = -1;
 let defaultOutputDir = '';
 const chaptersCache = {};
+// Identifies this page to the server so a new search can supersede older ones.
+const searchClientId = Math.random().toString(36).slice(2);
+let searchController = null;
 
 /**
- * Get high-resolution cover URL for expanded view.
- * O'Reilly provides larger covers at /covers/urn:orm:book:{id}/400w/
+ * Get a cover thumbnail URL. The server fetches each cover once and caches
+ * resized copies, so repeat searches render from the browser cache.
  */
-function getHighResCoverUrl(bookId) {
-    return `https://learning.oreilly.com/covers/urn:orm:book:${bookId}/400w/`;
+function getCoverUrl(bookId, width) {
+    return `${API}/api/cover/${encodeURIComponent(bookId)}?w=${width}`;
 }
 
 async function checkAuth() {
@@ -112,11 +115,19 @@ async function search(query) {
     const loader = document.getElementById('search-loader');
     const container = document.getElementById('search-results');
 
+    if (searchController) searchController.abort();
+    const controller = new AbortController();
+    searchController = controller;
+
     loader.classList.remove('hidden');
 
     try {
-        const res = await fetch(`${API}/api/search?q=${encodeURIComponent(query)}`);
+        const res = await fetch(
+            `${API}/api/search?q=${encodeURIComponent(query)}&client=${searchClientId}`,
+            { signal: controller.signal }
+        );
         const data = await res.json();
+        if (data.cancelled || controller !== searchController) return;
 
         loader.classList.add('hidden');
         container.innerHTML = '';
@@ -144,6 +155,7 @@ async function search(query) {
             container.appendChild(div);
         }
     } catch (err) {
+        if (err.name === 'AbortError') return;
         loader.classList.add('hidden');
         container.innerHTML = `
             <div class="text-center py-16 text-red-600">
@@ -157,7 +169,7 @@ function createBookCardHTML(book) {
     return `
         <!-- Collapsed Summary -->
         <div class="book-summary flex items-center gap-4 p-4 cursor-pointer">
-            <img src="${book.cover_url}" alt="${book.title} cover" class="w-12 h-16 object-cover rounded shadow-sm flex-shrink-0" loading="lazy">
+            <img src="${getCoverUrl(book.id, 96)}" alt="${book.title} cover" class="w-12 h-16 object-cover rounded shadow-sm flex-shrink-0" loading="lazy">
             <div class="flex-1 min-w-0">
                 <h3 class="text-[0.9375rem] font-semibold text-zinc-900 leading-snug truncate">${book.title}</h3>
                 <p class="text-sm text-zinc-500 truncate">${book.authors?.join(', ') || 'Unknown Author'}</p>
@@ -179,7 +191,7 @@ function createBookCardHTML(book) {
             <div class="relative px-5 pb-5 pt-2 border-t border-zinc-100 animate-fade-in">
                 <!-- Book Detail -->
                 <div class="flex gap-5 py-5">
-                    <img class="w-24 h-32 object-cover rounded-lg shadow-md flex-shrink-0" src="${getHighResCoverUrl(book.id)}" alt="${book.title} cover">
+                    <img class="w-24 h-32 object-cover rounded-lg shadow-md flex-shrink-0" src="${getCoverUrl(book.id, 192)}" alt="${book.title} cover">
                     <div class="flex-1 min-w-0">
                         <h2 class="text-xl font-semibold text-zinc-900 leading-tight mb-1">${book.title}</h2>
                         <p class="text-[0.9375rem] text-zinc-500 mb-3">by ${book.authors?.join(', ') || 'Unknown Author'}</p>